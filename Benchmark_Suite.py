@@ -0,0 +1,256 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from statistics import median
+from typing import Callable, Dict, List, Tuple
+
+from E_Commerce_Product import Product
+from Employee_Management import Employee
+from Financial_Trading_System import ProfessionalTrader
+from Vehicle_fleet_Management import Car, Motorcycle, Truck
+
+MODULES = ["E_Commerce_Product", "Employee_Management", "Financial_Trading_System", "Vehicle_fleet_Management"]
+DEFAULT_HISTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_history.json")
+STRATEGY = {"stocks": ["AAPL", "GOOG"], "crypto": ["BTC", "ETH"], "allocation": {"stocks": 0.7, "crypto": 0.3}}
+
+
+def make_products(n: int) -> List[Product]:
+    categories = Product.categories
+    return [Product(f"Product {i}", 10.0 + i % 5000, i % 50, i % 100, categories[i % len(categories)])
+            for i in range(n)]
+
+
+def make_csv_lines(n: int) -> List[str]:
+    departments = list(Employee.departments)
+    countries = list(Employee.tax_rates)
+    return [f"Employee {i},{departments[i % len(departments)]},{40000 + i % 50000},{countries[i % len(countries)]},"
+            f"employee{i}@globaltech.com" for i in range(n)]
+
+
+def make_employees(n: int) -> List[Employee]:
+    return [Employee.from_csv_data(line) for line in make_csv_lines(n)]
+
+
+def make_accounts(n: int) -> List[ProfessionalTrader]:
+    return [ProfessionalTrader(f"PT{i}", "Benchmark", 100000.0) for i in range(n)]
+
+
+def make_vehicles(n: int) -> List:
+    vehicles = []
+    for i in range(n):
+        kind = i % 3
+        if kind == 0:
+            vehicles.append(Car(f"CAR{i}", "Toyota", "Camry", 2023, 45.0, True, 12000, "Petrol", 5, "Automatic", i % 2 == 0))
+        elif kind == 1:
+            vehicles.append(Motorcycle(f"BIKE{i}", "Harley", "Street 750", 2022, 35.0, True, 8000, "Petrol", 750, "Cruiser"))
+        else:
+            vehicles.append(Truck(f"TRUCK{i}", "Ford", "F-150", 2023, 85.0, True, 15000, "Diesel", 5000, True, 8000))
+    return vehicles
+
+
+def _timed(operation: Callable[[], None]) -> float:
+    gc.collect()
+    started = time.perf_counter()
+    operation()
+    return time.perf_counter() - started
+
+
+def bench_product_final_price(n: int) -> float:
+    products = make_products(n)
+    return _timed(lambda: [p.final_price for p in products])
+
+
+def bench_product_summary(n: int) -> float:
+    products = make_products(n)
+    return _timed(lambda: [p.product_summary() for p in products])
+
+
+def bench_employee_from_csv(n: int) -> float:
+    lines = make_csv_lines(n)
+    return _timed(lambda: [Employee.from_csv_data(line) for line in lines])
+
+
+def bench_employee_net_salary(n: int) -> float:
+    employees = make_employees(n)
+    return _timed(lambda: [e.calculate_net_salary() for e in employees])
+
+
+def bench_account_withdraw(n: int) -> float:
+    accounts = make_accounts(n)
+    return _timed(lambda: [a.withdraw(10.0) for a in accounts])
+
+
+def bench_diversified_strategy(n: int) -> float:
+    accounts = make_accounts(n)
+    return _timed(lambda: [a.execute_diversified_strategy(STRATEGY) for a in accounts])
+
+
+def bench_vehicle_rental_cost(n: int) -> float:
+    vehicles = make_vehicles(n)
+    return _timed(lambda: [v.calculate_rental_cost(7) for v in vehicles])
+
+
+def bench_vehicle_info(n: int) -> float:
+    vehicles = make_vehicles(n)
+    return _timed(lambda: [v.get_vehicle_info() for v in vehicles])
+
+
+BENCHMARKS: Dict[str, Callable[[int], float]] = {
+    "product.final_price": bench_product_final_price,
+    "product.product_summary": bench_product_summary,
+    "employee.from_csv_data": bench_employee_from_csv,
+    "employee.calculate_net_salary": bench_employee_net_salary,
+    "account.withdraw": bench_account_withdraw,
+    "account.execute_diversified_strategy": bench_diversified_strategy,
+    "vehicle.calculate_rental_cost": bench_vehicle_rental_cost,
+    "vehicle.get_vehicle_info": bench_vehicle_info,
+}
+
+FACTORIES: Dict[str, Callable[[int], List]] = {
+    "Product": make_products,
+    "Employee": make_employees,
+    "ProfessionalTrader": make_accounts,
+    "Vehicle": make_vehicles,
+}
+
+
+def memory_per_object(factory: Callable[[int], List], n: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        objects = factory(n)
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return (after - before) / len(objects)
+
+
+def import_time(module: str, samples: int = 5) -> float:
+    # Measured in a fresh interpreter so the module is not already cached; the
+    # fastest of several samples filters out process start-up noise.
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    timings = []
+    for _ in range(samples):
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        timings.append(float(output.stdout.strip().splitlines()[-1]))
+    return min(timings)
+
+
+def run_suite(sizes: List[int], repeats: int = 3) -> Dict:
+    throughput: Dict[str, Dict[str, float]] = {}
+    for name, bench in BENCHMARKS.items():
+        throughput[name] = {}
+        for n in sizes:
+            best = min(bench(n) for _ in range(repeats))
+            throughput[name][str(n)] = n / best if best else float("inf")
+    memory_size = min(sizes[-1], 100000)
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sizes": sizes,
+        "ops_per_second": throughput,
+        "bytes_per_object": {name: memory_per_object(factory, memory_size) for name, factory in FACTORIES.items()},
+        "import_seconds": {module: import_time(module) for module in MODULES},
+    }
+
+
+def load_history(path: str) -> List[Dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def save_history(path: str, history: List[Dict]) -> None:
+    with open(path, "w") as handle:
+        json.dump(history, handle, indent=2)
+
+
+def recent_baseline(history: List[Dict], window: int = 5) -> Dict:
+    # Median of every metric over the last `window` passing runs: one lucky
+    # run cannot raise the bar and one failed run never lowers it.
+    recent = [run for run in history if run.get("passed", True)][-window:]
+    samples: Dict = {"ops_per_second": {}, "bytes_per_object": {}, "import_seconds": {}}
+    for run in recent:
+        for name, by_size in run["ops_per_second"].items():
+            by_name = samples["ops_per_second"].setdefault(name, {})
+            for size, value in by_size.items():
+                by_name.setdefault(size, []).append(value)
+        for section in ("bytes_per_object", "import_seconds"):
+            for name, value in run[section].items():
+                samples[section].setdefault(name, []).append(value)
+    return {
+        "ops_per_second": {name: {size: median(values) for size, values in by_size.items()}
+                           for name, by_size in samples["ops_per_second"].items()},
+        "bytes_per_object": {name: median(values) for name, values in samples["bytes_per_object"].items()},
+        "import_seconds": {name: median(values) for name, values in samples["import_seconds"].items()},
+    }
+
+
+def find_regressions(run: Dict, baseline: Dict, threshold: float,
+                     import_threshold: float) -> List[Tuple[str, str, float, float]]:
+    # Throughput may not drop, and memory may not grow, by more than
+    # `threshold` (a fraction) relative to the baseline. Import time is far
+    # noisier at millisecond scale and gets its own, wider `import_threshold`.
+    regressions = []
+    for name, by_size in run["ops_per_second"].items():
+        for size, value in by_size.items():
+            previous = baseline.get("ops_per_second", {}).get(name, {}).get(size)
+            if previous and value < previous * (1 - threshold):
+                regressions.append((f"{name}@{size}", "ops_per_second", previous, value))
+    for section, allowed in (("bytes_per_object", threshold), ("import_seconds", import_threshold)):
+        for name, value in run[section].items():
+            previous = baseline.get(section, {}).get(name)
+            if previous and value > previous * (1 + allowed):
+                regressions.append((name, section, previous, value))
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the hot paths of the four domain models.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="object counts to run each benchmark at (up to 1000000)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--history", default=DEFAULT_HISTORY)
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed relative slowdown before a run counts as a regression")
+    parser.add_argument("--import-threshold", type=float, default=0.5,
+                        help="allowed relative growth in module import time")
+    parser.add_argument("--window", type=int, default=5,
+                        help="number of recent passing runs the baseline is the median of")
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--save-failures", action="store_true",
+                        help="also record runs that regressed (they never become the baseline)")
+    args = parser.parse_args(argv)
+
+    history = load_history(args.history)
+    run = run_suite(sorted(args.sizes), args.repeats)
+    for name, by_size in run["ops_per_second"].items():
+        print(f"{name:40s} " + "  ".join(f"{size:>8s}: {ops:12,.0f}/s" for size, ops in by_size.items()))
+    for name, value in run["bytes_per_object"].items():
+        print(f"{name + ' bytes/object':40s} {value:10.1f}")
+    for name, value in run["import_seconds"].items():
+        print(f"{name + ' import':40s} {value * 1000:10.2f} ms")
+
+    regressions = find_regressions(run, recent_baseline(history, args.window), args.threshold,
+                                   args.import_threshold)
+    run["passed"] = not regressions
+    for name, metric, previous, value in regressions:
+        print(f"REGRESSION {name} {metric}: {previous:,.2f} -> {value:,.2f}")
+    if not args.no_save and (not regressions or args.save_failures):
+        history.append(run)
+        save_history(args.history, history)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,18 @@
 
 import re
+from array import array
+from bisect import bisect_left, bisect_right, insort
+
+from Instrumentation import hot_path
+
+
 class Product:
+    categories = ["Electronics", "Clothing", "Books", "Home", "Sports"]
+    max_base_price = 50000
+    max_stock_quantity = 10000
+
     def __init__(self, name, price, discount_percentage, quantity, category):
+        self._summary_cache = None
         self._name = name
         self.base_price = price
         self._discount_percent = discount_percentage
@@ -17,6 +28,7 @@ class Product:
         if not (3<=len(value)<=50):
             raise ValueError("Name must be between 3 and 50 characters")
         self._name = value
+        self._summary_cache = None
 
     @property
     def base_price(self):
@@ -24,9 +36,10 @@ class Product:
     
     @base_price.setter
     def base_price(self, value):
-        if value <= 0 or value > 50000:
+        if value <= 0 or value > Product.max_base_price:
             raise ValueError("Base price must be between 0 and 50000")
         self._base_price = value
+        self._summary_cache = None
     
     @property
     def discount_percent(self):
@@ -35,6 +48,7 @@ class Product:
     @discount_percent.setter
     def discount_percent(self, value):
         self._discount_percent = round(value, 2)
+        self._summary_cache = None
 
     @property
     def stock_quantity(self):
@@ -42,9 +56,10 @@ class Product:
     
     @stock_quantity.setter
     def stock_quantity(self, value):
-        if value < 0 or value > 10000:
+        if value < 0 or value > Product.max_stock_quantity:
             raise ValueError("Stock quantity must be between 0 and 10000")
         self._stock_quantity = value
+        self._summary_cache = None
     
     @property
     def category(self):
@@ -52,20 +67,23 @@ class Product:
     
     @category.setter
     def category(self, value):
-        categories = ["Electronics", "Clothing", "Books", "Home","Sports"]
-        if value not in categories:
+        if value not in Product.categories:
             raise ValueError("Invalid category")
         self._category = value
+        self._summary_cache = None
     
     @property
+    @hot_path
     def final_price(self):
         return round(self._base_price * (1 - self._discount_percent / 100), 2)
     
     @property
+    @hot_path
     def savings_amount(self):
         return round(self._base_price - self.final_price, 2)
 
     @property
+    @hot_path
     def availability_status(self):
         if self.stock_quantity==0:
             return "Out of Stock"
@@ -74,59 +92,436 @@ class Product:
         else:
             return "In Stock"
         
+    @hot_path
     def product_summary(self):
-        return f"Product: {self._name}\nCategory: {self._category}\nBase Price: ${self._base_price:.2f}\nDiscount: {self._discount_percent}%\nFinal Price: ${self.final_price:.2f}\nSavings: ${self.savings_amount:.2f}\nAvailability: {self.availability_status}"
-    
-    
+        summary = self._summary_cache
+        if summary is None:
+            final_price = self.final_price
+            savings = round(self._base_price - final_price, 2)
+            summary = f"Product: {self._name}\nCategory: {self._category}\nBase Price: ${self._base_price:.2f}\nDiscount: {self._discount_percent}%\nFinal Price: ${final_price:.2f}\nSavings: ${savings:.2f}\nAvailability: {self.availability_status}"
+            self._summary_cache = summary
+        return summary
 
 
+def _catalog_column(column):
+    def getter(self):
+        return getattr(self._catalog, column)[self._index]
 
+    def setter(self, value):
+        self._catalog._set_value(self._index, column, value)
 
+    return property(getter, setter)
 
-product = Product("Gaming Laptop", 1299.00, 15.5, 25, "Electronics")
-assert product.name == "Gaming Laptop"
-assert product.base_price == 1299.00
-assert product.discount_percent == 15.5
-assert abs(product.final_price - 1097.66) < 0.01
-assert abs(product.savings_amount - 201.34) < 0.01
-assert product.availability_status == "In Stock"
 
+class CatalogProduct(Product):
+    # Product view over one row of a ProductCatalog. The private attributes
+    # Product reads and writes are redirected to the catalog columns, so every
+    # Product property and setter keeps working unchanged. Views are created on
+    # access and hold only the catalog and row index; Product has no
+    # __slots__, so they still carry an (empty) instance __dict__.
 
-product.discount_percent = 20.567
-assert product.discount_percent == 20.57
-assert abs(product.final_price - 1031.79) < 0.01
+    def __init__(self, catalog, index):
+        self._catalog = catalog
+        self._index = index
 
-product.stock_quantity = 5
-assert product.availability_status == "Low Stock"
+    _name = _catalog_column("_names")
+    _base_price = _catalog_column("_base_prices")
+    _discount_percent = _catalog_column("_discount_percents")
+    _stock_quantity = _catalog_column("_stock_quantities")
 
-try:
-    product.name='AB'
-    assert False, "Invalid name should raise an error"
-except ValueError as e:
-    pass
-    
-try:
-    product.base_price = -100
-    assert False, "Invalid base price should raise an error"
-except ValueError as e:
-    pass
-    
-try:
-    product.category = "Food"
-    assert False, "Invalid category should raise an error"
-except ValueError as e:
-    pass
+    @property
+    def _category(self):
+        return self._catalog._category_names[self._catalog._category_codes[self._index]]
+
+    @_category.setter
+    def _category(self, value):
+        self._catalog._set_value(self._index, "_category_codes", self._catalog._category_code(value))
+
+    @property
+    def _summary_cache(self):
+        return self._catalog._summaries[self._index]
+
+    @_summary_cache.setter
+    def _summary_cache(self, value):
+        self._catalog._summaries[self._index] = value
+
+    @property
+    def index(self):
+        return self._index
+
+
+class ProductCatalog:
+    # Columnar product storage: one contiguous array per numeric field, so
+    # prices, savings and availability can be computed for many rows at once.
+    def __init__(self, products=()):
+        self._names = []
+        self._base_prices = array("d")
+        self._discount_percents = array("d")
+        self._stock_quantities = array("l")
+        self._category_codes = array("H")
+        self._category_names = []
+        self._category_lookup = {}
+        self._summaries = []
+        self._index = None
+        for product in products:
+            self.add_product(product)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self._names)
+        if not 0 <= index < len(self._names):
+            raise IndexError("Product index out of range")
+        return CatalogProduct(self, index)
+
+    def __iter__(self):
+        for index in range(len(self._names)):
+            yield CatalogProduct(self, index)
+
+    def add(self, name, price, discount_percentage, quantity, category):
+        if price <= 0 or price > Product.max_base_price:
+            raise ValueError("Base price must be between 0 and 50000")
+        quantity = self._whole_quantity(quantity)
+        code = self._category_code(category)
+        self._names.append(name)
+        self._base_prices.append(price)
+        self._discount_percents.append(discount_percentage)
+        self._stock_quantities.append(quantity)
+        self._category_codes.append(code)
+        self._summaries.append(None)
+        index = len(self._names) - 1
+        if self._index is not None:
+            self._index.add(index)
+        return CatalogProduct(self, index)
+
+    def add_product(self, product):
+        return self.add(product.name, product.base_price, product.discount_percent, product.stock_quantity, product.category)
+
+    @staticmethod
+    def _whole_quantity(value):
+        # The stock column holds integers; whole floats such as 7.0 are
+        # accepted and stored as ints.
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise ValueError("Stock quantity must be a whole number")
+        return value
+
+    def _category_code(self, category):
+        code = self._category_lookup.get(category)
+        if code is None:
+            code = len(self._category_names)
+            self._category_names.append(category)
+            self._category_lookup[category] = code
+        return code
+
+    def _set_value(self, index, column, value):
+        if column == "_stock_quantities":
+            value = self._whole_quantity(value)
+        getattr(self, column)[index] = value
+        self._summaries[index] = None
+        if self._index is not None and column != "_names":
+            self._index.update(index)
+
+    def _positions(self, indices):
+        if indices is None:
+            return range(len(self._names))
+        if isinstance(indices, slice):
+            return range(len(self._names))[indices]
+        return indices
+
+    def final_prices(self, indices=None):
+        base_prices = self._base_prices
+        discounts = self._discount_percents
+        if indices is None:
+            return array("d", [round(b * (1 - d / 100), 2) for b, d in zip(base_prices, discounts)])
+        return array("d", [round(base_prices[i] * (1 - discounts[i] / 100), 2) for i in self._positions(indices)])
+
+    def savings_amounts(self, indices=None):
+        positions = self._positions(indices)
+        base_prices = self._base_prices if indices is None else [self._base_prices[i] for i in positions]
+        return array("d", [round(b - f, 2) for b, f in zip(base_prices, self.final_prices(indices))])
+
+    def availability_statuses(self, indices=None):
+        quantities = self._stock_quantities
+        if indices is not None:
+            quantities = [quantities[i] for i in self._positions(indices)]
+        return ["Out of Stock" if q == 0 else "Low Stock" if q < 10 else "In Stock" for q in quantities]
+
+    def bulk_update(self, ids, discount_percent=None, base_price=None, stock_quantity=None, category=None):
+        # Validates every row against the Product setter rules first and only
+        # then writes the accepted rows straight into the columns, so either a
+        # row is applied completely or it is reported in "rejected".
+        ids = list(ids)
+        count = len(self._names)
+        updates = {"discount_percent": discount_percent, "base_price": base_price,
+                   "stock_quantity": stock_quantity, "category": category}
+        updates = {field: list(values) for field, values in updates.items() if values is not None}
+        for field, values in updates.items():
+            if len(values) != len(ids):
+                raise ValueError(f"{field} must have one value per id")
+
+        reasons = [None if isinstance(i, int) and 0 <= i < count else "Unknown product id" for i in ids]
+        if "discount_percent" in updates:
+            values = updates["discount_percent"]
+            for row, value in enumerate(values):
+                if reasons[row] is None:
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        values[row] = round(value, 2)
+                    else:
+                        reasons[row] = "Discount percent must be a number"
+        if "base_price" in updates:
+            limit = Product.max_base_price
+            for row, value in enumerate(updates["base_price"]):
+                if reasons[row] is None and not (isinstance(value, (int, float)) and not isinstance(value, bool)
+                                                 and 0 < value <= limit):
+                    reasons[row] = "Base price must be between 0 and 50000"
+        if "stock_quantity" in updates:
+            limit = Product.max_stock_quantity
+            values = updates["stock_quantity"]
+            for row, value in enumerate(values):
+                if reasons[row] is None:
+                    try:
+                        values[row] = value = self._whole_quantity(value)
+                    except ValueError:
+                        value = -1
+                    if not 0 <= value <= limit:
+                        reasons[row] = "Stock quantity must be between 0 and 10000"
+        if "category" in updates:
+            categories = set(Product.categories)
+            for row, value in enumerate(updates["category"]):
+                if reasons[row] is None and not (isinstance(value, str) and value in categories):
+                    reasons[row] = "Invalid category"
+
+        accepted = [row for row, reason in enumerate(reasons) if reason is None]
+        if "discount_percent" in updates:
+            values = updates["discount_percent"]
+            for row in accepted:
+                self._discount_percents[ids[row]] = values[row]
+        if "base_price" in updates:
+            values = updates["base_price"]
+            for row in accepted:
+                self._base_prices[ids[row]] = values[row]
+        if "stock_quantity" in updates:
+            values = updates["stock_quantity"]
+            for row in accepted:
+                self._stock_quantities[ids[row]] = values[row]
+        if "category" in updates:
+            values = updates["category"]
+            for row in accepted:
+                self._category_codes[ids[row]] = self._category_code(values[row])
+
+        summaries = self._summaries
+        for row in accepted:
+            summaries[ids[row]] = None
+        if self._index is not None and accepted:
+            if len(accepted) > count // 4:
+                self._index.rebuild()
+            else:
+                for row in accepted:
+                    self._index.update(ids[row])
+        return {
+            "updated": len(accepted),
+            "rejected": [(ids[row], reason) for row, reason in enumerate(reasons) if reason is not None],
+        }
+
+    def render_summaries(self, indices=None, separator="\n\n"):
+        return separator.join(self._summaries_for(self._positions(indices)))
+
+    def write_summaries(self, stream, indices=None, separator="\n\n"):
+        summaries = self._summaries_for(self._positions(indices))
+        stream.write(separator.join(summaries))
+        return len(summaries)
+
+    def _summaries_for(self, positions):
+        summaries = self._summaries
+        missing = [i for i in positions if summaries[i] is None]
+        if missing:
+            final_prices = self.final_prices(missing)
+            statuses = self.availability_statuses(missing)
+            names = self._category_names
+            for i, final_price, status in zip(missing, final_prices, statuses):
+                base_price = self._base_prices[i]
+                savings = round(base_price - final_price, 2)
+                summaries[i] = f"Product: {self._names[i]}\nCategory: {names[self._category_codes[i]]}\nBase Price: ${base_price:.2f}\nDiscount: {self._discount_percents[i]}%\nFinal Price: ${final_price:.2f}\nSavings: ${savings:.2f}\nAvailability: {status}"
+        return [summaries[i] for i in positions]
+
+    def build_index(self):
+        if self._index is None:
+            self._index = CatalogIndex(self)
+        return self._index
+
+    def query(self, category=None, min_price=None, max_price=None, availability=None):
+        indices = self.build_index().query(category, min_price, max_price, availability)
+        return [CatalogProduct(self, index) for index in indices]
+
+
+class CatalogIndex:
+    # Secondary indexes over a ProductCatalog: a hash index on category, a
+    # sorted (final_price, index) list for range queries and one bucket per
+    # availability status. The catalog calls update() whenever a row changes.
+    def __init__(self, catalog):
+        self._catalog = catalog
+        self.rebuild()
+
+    def rebuild(self):
+        catalog = self._catalog
+        prices = catalog.final_prices()
+        statuses = catalog.availability_statuses()
+        categories = [catalog._category_names[code] for code in catalog._category_codes]
+        self._by_category = {}
+        self._by_availability = {"In Stock": set(), "Low Stock": set(), "Out of Stock": set()}
+        for index, (category, status) in enumerate(zip(categories, statuses)):
+            self._by_category.setdefault(category, set()).add(index)
+            self._by_availability[status].add(index)
+        self._price_keys = sorted(zip(prices, range(len(prices))))
+        self._keys = list(zip(categories, prices, statuses))
+
+    def _row_key(self, index):
+        catalog = self._catalog
+        category = catalog._category_names[catalog._category_codes[index]]
+        price = round(catalog._base_prices[index] * (1 - catalog._discount_percents[index] / 100), 2)
+        quantity = catalog._stock_quantities[index]
+        status = "Out of Stock" if quantity == 0 else "Low Stock" if quantity < 10 else "In Stock"
+        return category, price, status
+
+    def add(self, index):
+        key = self._row_key(index)
+        category, price, status = key
+        self._by_category.setdefault(category, set()).add(index)
+        self._by_availability[status].add(index)
+        insort(self._price_keys, (price, index))
+        if index == len(self._keys):
+            self._keys.append(key)
+        else:
+            self._keys[index] = key
+
+    def remove(self, index):
+        category, price, status = self._keys[index]
+        self._by_category[category].discard(index)
+        self._by_availability[status].discard(index)
+        position = bisect_left(self._price_keys, (price, index))
+        del self._price_keys[position]
+
+    def update(self, index):
+        if self._keys[index] != self._row_key(index):
+            self.remove(index)
+            self.add(index)
+
+    def query(self, category=None, min_price=None, max_price=None, availability=None):
+        filters = []
+        if category is not None:
+            filters.append(self._by_category.get(category, set()))
+        if availability is not None:
+            if availability not in self._by_availability:
+                raise ValueError("Invalid availability status")
+            filters.append(self._by_availability[availability])
+        filters.sort(key=len)
+
+        if min_price is not None or max_price is not None:
+            lo = 0 if min_price is None else bisect_left(self._price_keys, (min_price, -1))
+            hi = len(self._price_keys) if max_price is None else bisect_right(self._price_keys, (max_price, float("inf")))
+            if not filters or hi - lo <= len(filters[0]):
+                return [index for _, index in self._price_keys[lo:hi] if all(index in f for f in filters)]
+            price_of = self._keys
+            low = float("-inf") if min_price is None else min_price
+            high = float("inf") if max_price is None else max_price
+            matches = [i for i in filters[0] if low <= price_of[i][1] <= high and all(i in f for f in filters[1:])]
+        elif filters:
+            matches = [i for i in filters[0] if all(i in f for f in filters[1:])]
+        else:
+            matches = range(len(self._keys))
+        return sorted(matches, key=lambda i: (self._keys[i][1], i))
     
     
 
-assert "Gaming Laptop" in product.product_summary()
-assert "1299.00" in product.product_summary()
-assert "Low Stock" in product.product_summary()
 
-print(product.product_summary())
+if __name__ == "__main__":
+    product = Product("Gaming Laptop", 1299.00, 15.5, 25, "Electronics")
+    assert product.name == "Gaming Laptop"
+    assert product.base_price == 1299.00
+    assert product.discount_percent == 15.5
+    assert abs(product.final_price - 1097.66) < 0.01
+    assert abs(product.savings_amount - 201.34) < 0.01
+    assert product.availability_status == "In Stock"
+
+
+    product.discount_percent = 20.567
+    assert product.discount_percent == 20.57
+    assert abs(product.final_price - 1031.79) < 0.01
+
+    product.stock_quantity = 5
+    assert product.availability_status == "Low Stock"
+
+    try:
+        product.name='AB'
+        assert False, "Invalid name should raise an error"
+    except ValueError as e:
+        pass
+
+    try:
+        product.base_price = -100
+        assert False, "Invalid base price should raise an error"
+    except ValueError as e:
+        pass
+
+    try:
+        product.category = "Food"
+        assert False, "Invalid category should raise an error"
+    except ValueError as e:
+        pass
+
+
+
+    assert "Gaming Laptop" in product.product_summary()
+    assert "1299.00" in product.product_summary()
+    assert "Low Stock" in product.product_summary()
+
+    print(product.product_summary())
 
 
+    catalog = ProductCatalog([product, Product("Running Shoes", 120.00, 10, 0, "Sports")])
+    catalog.add("Python Cookbook", 45.50, 0, 200, "Books")
+    assert len(catalog) == 3
+    assert abs(catalog.final_prices()[0] - product.final_price) < 0.01
+    assert list(catalog.savings_amounts([1, 2])) == [12.0, 0.0]
+    assert catalog.availability_statuses() == ["Low Stock", "Out of Stock", "In Stock"]
 
+    shoes = catalog[1]
+    assert isinstance(shoes, Product)
+    assert shoes.final_price == 108.0
+    shoes.stock_quantity = 50
+    assert catalog.availability_statuses(slice(1, 2)) == ["In Stock"]
+    shoes.stock_quantity = 50.0
+    assert shoes.stock_quantity == 50 and type(shoes.stock_quantity) is int
+    try:
+        shoes.stock_quantity = 50.5
+        raise AssertionError("fractional stock accepted")
+    except ValueError:
+        pass
+    assert "Running Shoes" in shoes.product_summary()
 
+    catalog.build_index()
+    assert [p.name for p in catalog.query(category="Sports")] == ["Running Shoes"]
+    assert [p.name for p in catalog.query(max_price=200)] == ["Python Cookbook", "Running Shoes"]
+    assert catalog.query(category="Electronics", max_price=500, availability="In Stock") == []
+    catalog[0].discount_percent = 70
+    catalog[0].stock_quantity = 40
+    assert [p.name for p in catalog.query(category="Electronics", max_price=500, availability="In Stock")] == ["Gaming Laptop"]
+    assert catalog.query(availability="Low Stock") == []
 
+    report = catalog.bulk_update([0, 1, 2, 7], discount_percent=[10, 33.333, 5, 5], stock_quantity=[8, 12, -1, 3])
+    assert report["updated"] == 2
+    assert report["rejected"] == [(2, "Stock quantity must be between 0 and 10000"), (7, "Unknown product id")]
+    assert catalog[1].discount_percent == 33.33
+    assert catalog[2].discount_percent == 0 and catalog[2].stock_quantity == 200
+    assert [p.name for p in catalog.query(availability="Low Stock")] == ["Gaming Laptop"]
 
+    summary = catalog[2].product_summary()
+    assert catalog[2].product_summary() is summary
+    assert catalog.render_summaries([2]) == summary
+    catalog[2].stock_quantity = 0
+    assert "Out of Stock" in catalog.render_summaries([2])
+    assert catalog.render_summaries().count("Product: ") == 3
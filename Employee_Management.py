@@ -1,5 +1,346 @@
 from datetime import datetime, timedelta
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from contextlib import nullcontext
+from types import MappingProxyType
+from functools import lru_cache
+from itertools import islice
+import csv
+import multiprocessing
 import re 
+import threading
+import time
+
+from Instrumentation import hot_path
+
+
+class EmailValidator:
+    # The pattern is compiled once and results are memoized in a bounded LRU
+    # cache. Optional domain rules are plain set lookups on the lower-cased
+    # domain; changing them clears the cache.
+    def __init__(self,pattern=r"^[\w\.-]+@[\w\.-]+\.\w+$",cache_size=65536,allowed_domains=None,blocked_domains=None):
+        self.pattern=re.compile(pattern)
+        self.allowed_domains={d.lower() for d in allowed_domains} if allowed_domains else None
+        self.blocked_domains={d.lower() for d in blocked_domains} if blocked_domains else set()
+        self.is_valid=lru_cache(maxsize=cache_size)(self._check)
+
+    def _check(self,email):
+        if not self.pattern.match(email):
+            return False
+        if self.allowed_domains is None and not self.blocked_domains:
+            return True
+        domain=email.rpartition("@")[2].lower()
+        if domain in self.blocked_domains:
+            return False
+        return self.allowed_domains is None or domain in self.allowed_domains
+
+    def validate_many(self,emails):
+        return list(map(self.is_valid,emails))
+
+    def allow_domains(self,*domains):
+        if self.allowed_domains is None:
+            self.allowed_domains=set()
+        self.allowed_domains.update(d.lower() for d in domains)
+        self.is_valid.cache_clear()
+
+    def block_domains(self,*domains):
+        self.blocked_domains.update(d.lower() for d in domains)
+        self.is_valid.cache_clear()
+
+    def clear_domain_rules(self):
+        self.allowed_domains=None
+        self.blocked_domains=set()
+        self.is_valid.cache_clear()
+
+
+class ClassAttributeSequence:
+    # In-process counter stored on a class attribute (Employee.next_employee_id),
+    # guarded by a lock so concurrent threads never receive the same range.
+    def __init__(self,owner,attribute):
+        self.owner=owner
+        self.attribute=attribute
+        self._lock=threading.Lock()
+
+    def reserve(self,count):
+        with self._lock:
+            first=getattr(self.owner,self.attribute)
+            setattr(self.owner,self.attribute,first+count)
+        return first
+
+
+class SharedCounterSequence:
+    # Counter in shared memory; create it before starting worker processes
+    # and hand it to them so every process draws from the same sequence.
+    def __init__(self,start=1):
+        self.value=multiprocessing.Value("q",start)
+
+    def reserve(self,count):
+        with self.value.get_lock():
+            first=self.value.value
+            self.value.value=first+count
+        return first
+
+
+class FileSequence:
+    # Counter persisted in a small text file and guarded with flock, usable by
+    # unrelated processes and surviving restarts (POSIX only).
+    def __init__(self,path,start=1):
+        self.path=path
+        self.start=start
+
+    def reserve(self,count):
+        import fcntl
+        with open(self.path,"a+") as handle:
+            fcntl.flock(handle,fcntl.LOCK_EX)
+            try:
+                handle.seek(0)
+                text=handle.read().strip()
+                first=int(text) if text else self.start
+                handle.seek(0)
+                handle.truncate()
+                handle.write(str(first+count))
+                handle.flush()
+            finally:
+                fcntl.flock(handle,fcntl.LOCK_UN)
+        return first
+
+
+class EmployeeIdAllocator:
+    # Hands out EMP-YYYY-NNNN ids. Each thread takes block_size numbers from the
+    # sequence at a time and formats ids from its private block without locking.
+    # The year is cached until the next new year. Numbers above 9999 simply
+    # widen the numeric part (EMP-YYYY-10000).
+    def __init__(self,sequence,block_size=1):
+        self.sequence=sequence
+        self.block_size=block_size
+        self._local=threading.local()
+        self._year=None
+        self._year_ends=0.0
+
+    def year(self):
+        if time.time()>=self._year_ends:
+            year=datetime.now().year
+            self._year=year
+            self._year_ends=datetime(year+1,1,1).timestamp()
+        return self._year
+
+    def reserve(self,count):
+        return self.sequence.reserve(count)
+
+    def reserve_ids(self,count):
+        first=self.sequence.reserve(count)
+        year=self.year()
+        return [f"EMP-{year}-{number:04d}" for number in range(first,first+count)]
+
+    def next_id(self):
+        local=self._local
+        number=getattr(local,"next",0)
+        if number>=getattr(local,"end",0):
+            number=self.sequence.reserve(self.block_size)
+            local.end=number+self.block_size
+        local.next=number+1
+        return f"EMP-{self.year()}-{number:04d}"
+
+    def discard_blocks(self):
+        self._local=threading.local()
+
+
+class PayrollResult:
+    # Column-oriented payroll output in the order of the input employees.
+    # The numeric columns are arrays, so they can be dumped with tofile().
+    def __init__(self,employee_ids,countries,gross,tax,net,tax_rates_version):
+        self.employee_ids=employee_ids
+        self.countries=countries
+        self.gross=gross
+        self.tax=tax
+        self.net=net
+        self.tax_rates_version=tax_rates_version
+
+    def __len__(self):
+        return len(self.employee_ids)
+
+    def totals(self):
+        return {"gross":round(sum(self.gross),2),"tax":round(sum(self.tax),2),"net":round(sum(self.net),2)}
+
+    def write_csv(self,path):
+        with open(path,"w",newline="") as handle:
+            writer=csv.writer(handle)
+            writer.writerow(["employee_id","country","gross","tax","net"])
+            writer.writerows(zip(self.employee_ids,self.countries,self.gross,self.tax,self.net))
+
+
+class PayrollEngine:
+    # Computes tax and net salary column by column, one tax rate lookup per
+    # country. Runs can be cached under a caller-chosen key (e.g. a pay period).
+    # A cached result is only reused for the same employee objects, in the
+    # same order, while Employee.tax_rates_version and
+    # Employee.payroll_inputs_version (bumped by salary and country changes)
+    # are unchanged, so the check is one identity-based tuple comparison.
+    def __init__(self):
+        self._cache={}
+
+    def clear(self):
+        self._cache.clear()
+
+    def run(self,employees,key=None):
+        employees=tuple(employees)
+        stamp=(Employee.tax_rates_version,Employee.payroll_inputs_version)
+        if key is not None:
+            cached=self._cache.get(key)
+            if cached is not None and cached[0]==stamp and cached[1]==employees:
+                return cached[2]
+
+        employee_ids=[employee.employee_id for employee in employees]
+        countries=[employee.country for employee in employees]
+        gross=array("d",[employee.base_salary for employee in employees])
+        by_country={}
+        for position,country in enumerate(countries):
+            by_country.setdefault(country,[]).append(position)
+
+        tax=array("d",[0.0])*len(employees)
+        for country,positions in by_country.items():
+            rate=Employee.tax_rates.get(country,0)
+            for position,amount in zip(positions,[round(gross[p]*rate,2) for p in positions]):
+                tax[position]=amount
+        net=array("d",[round(g-t,2) for g,t in zip(gross,tax)])
+
+        result=PayrollResult(employee_ids,countries,gross,tax,net,Employee.tax_rates_version)
+        if key is not None:
+            self._cache[key]=(stamp,employees,result)
+        return result
+
+
+class DepartmentStats:
+    # Per-department counters updated incrementally by the hiring, termination
+    # and attribute-change paths. Every update publishes a new immutable
+    # snapshot by swapping a single reference, so readers get a consistent view
+    # in O(1) without taking the writers' lock.
+    def __init__(self,departments):
+        self._lock=threading.Lock()
+        self._totals={department:self._empty() for department in departments}
+        self._snapshot=MappingProxyType({department:self._freeze(totals) for department,totals in self._totals.items()})
+
+    @staticmethod
+    def _empty():
+        return {"count":0,"total_salary":0,"rating_total":0.0,"rating_count":0,"by_country":Counter()}
+
+    @staticmethod
+    def _freeze(totals):
+        count=totals["count"]
+        return MappingProxyType({
+            "count":count,
+            "total_salary":totals["total_salary"],
+            "average_salary":totals["total_salary"]/count if count else 0,
+            "average_performance":totals["rating_total"]/totals["rating_count"] if totals["rating_count"] else 0,
+            "by_country":MappingProxyType({country:n for country,n in totals["by_country"].items() if n}),
+        })
+
+    def _publish(self,departments):
+        snapshot=dict(self._snapshot)
+        for department in departments:
+            snapshot[department]=self._freeze(self._totals[department])
+        self._snapshot=MappingProxyType(snapshot)
+
+    def _stage(self,staged,department):
+        # Updates are made on copies of the touched departments and only
+        # swapped in once every one of them succeeded, so a bad value cannot
+        # leave the totals half-updated.
+        totals=staged.get(department)
+        if totals is None:
+            current=self._totals.get(department) or self._empty()
+            totals=staged[department]=dict(current,by_country=Counter(current["by_country"]))
+        return totals
+
+    def _apply(self,staged,department,sign,salary,country,rating_total,rating_count):
+        totals=self._stage(staged,department)
+        totals["count"]+=sign
+        totals["total_salary"]+=sign*salary
+        totals["rating_total"]+=sign*rating_total
+        totals["rating_count"]+=sign*rating_count
+        totals["by_country"][country]+=sign
+
+    def _commit(self,staged):
+        self._totals.update(staged)
+        self._publish(staged)
+
+    def snapshot(self):
+        return self._snapshot
+
+    def export_totals(self):
+        with self._lock:
+            return {department:dict(totals,by_country=dict(totals["by_country"])) for department,totals in self._totals.items()}
+
+    def restore_totals(self,totals):
+        with self._lock:
+            self._totals={department:dict(values,by_country=Counter(values["by_country"])) for department,values in totals.items()}
+            self._snapshot=MappingProxyType({department:self._freeze(values) for department,values in self._totals.items()})
+
+    def record_hires(self,employees):
+        with self._lock:
+            staged={}
+            for employee in employees:
+                self._apply(staged,employee.department,1,employee.base_salary,employee.country,*employee._rating_summary())
+            self._commit(staged)
+
+    def record_termination(self,employee):
+        with self._lock:
+            staged={}
+            self._apply(staged,employee.department,-1,employee.base_salary,employee.country,*employee._rating_summary())
+            self._commit(staged)
+
+    def record_change(self,employee,department=None,base_salary=None,country=None):
+        # Called before the attribute changes: remove the employee's current
+        # contribution and add it back with the new values.
+        new_department=employee.department if department is None else department
+        with self._lock:
+            staged={}
+            self._apply(staged,employee.department,-1,employee.base_salary,employee.country,*employee._rating_summary())
+            self._apply(staged,new_department,1,
+                        employee.base_salary if base_salary is None else base_salary,
+                        employee.country if country is None else country,
+                        *employee._rating_summary())
+            self._commit(staged)
+
+    def record_rating(self,department,rating,count=1):
+        # A negative count (with the matching negative total) removes ratings.
+        with self._lock:
+            staged={}
+            totals=self._stage(staged,department)
+            totals["rating_total"]+=rating
+            totals["rating_count"]+=count
+            self._commit(staged)
+
+
+class RatingList(list):
+    # What Employee.performance_ratings returns. append/extend/+= record the
+    # ratings through add_performance_rating, so the running totals and the
+    # department statistics stay in step; other in-place edits are rejected.
+    def __init__(self,owner,ratings=()):
+        super().__init__(ratings)
+        self._owner=owner
+
+    def __reduce__(self):
+        return (RatingList,(self._owner,list(self)))
+
+    def append(self,rating):
+        self._owner.add_performance_rating(rating)
+
+    def extend(self,ratings):
+        ratings=list(ratings)
+        if any(rating<1 or rating>5 for rating in ratings):
+            raise ValueError("Invalid rating")
+        for rating in ratings:
+            self._owner.add_performance_rating(rating)
+
+    def __iadd__(self,ratings):
+        self.extend(ratings)
+        return self
+
+    def _read_only(self,*args,**kwargs):
+        raise TypeError("Ratings can only be appended; assign a new list to replace them")
+
+    __setitem__=__delitem__=__imul__=insert=remove=pop=clear=sort=reverse=_read_only
 
 
 class Employee:
@@ -7,7 +348,10 @@ class Employee:
     total_employees=0
     departments={"Engineering":0, "Sales":0, "HR":0, "Marketing":0}
     tax_rates={"USA":0.22, "India":0.18, "UK":0.25}
+    tax_rates_version=0
+    payroll_inputs_version=0
     next_employee_id=1
+    email_validator=EmailValidator()
 
 
     def __init__(self,name, department, base_salary, country,email):
@@ -17,29 +361,82 @@ class Employee:
         if not Employee.valid_email(email):
             raise ValueError("Invalid email")
         
-        self.name=name
-        self.department=department
-        self.base_salary=base_salary
-        self.country=country
-        self.email=email
-        self.hire_date=datetime.now()
-        self.performance_ratings=[]
-
+        base_salary=Employee.parse_salary(base_salary)
+        self._set_fields(name,department,base_salary,country,email,datetime.now())
+        Employee.department_statistics.record_hires([self])
         self.employee_id=self.generate_employee_id()
         Employee.total_employees+=1
         Employee.departments[department]+=1
+        self._active=True
+
+    def _set_fields(self,name,department,base_salary,country,email,hire_date):
+        self._active=False
+        self.name=name
+        self._department=department
+        self._base_salary=base_salary
+        self._country=country
+        self.email=email
+        self.hire_date=hire_date
+        self._performance_ratings=RatingList(self)
+        self._rating_times=[]
+        self._rating_totals=[0.0]
+
+    @property
+    def department(self):
+        return self._department
+
+    @department.setter
+    def department(self,value):
+        if value==self._department:
+            return
+        if not Employee.is_valid_department(value):
+            raise ValueError("Invalid department")
+        if self._active:
+            Employee.department_statistics.record_change(self,department=value)
+            Employee.departments[self._department]-=1
+            Employee.departments[value]+=1
+        self._department=value
+
+    @property
+    def base_salary(self):
+        return self._base_salary
+
+    @base_salary.setter
+    def base_salary(self,value):
+        value=Employee.parse_salary(value)
+        if self._active:
+            Employee.department_statistics.record_change(self,base_salary=value)
+        self._base_salary=value
+        Employee.payroll_inputs_version+=1
+
+    @property
+    def country(self):
+        return self._country
+
+    @country.setter
+    def country(self,value):
+        if self._active:
+            Employee.department_statistics.record_change(self,country=value)
+        self._country=value
+        Employee.payroll_inputs_version+=1
+
+    def terminate(self):
+        if not self._active:
+            raise ValueError("Employee is not active")
+        Employee.department_statistics.record_termination(self)
+        self._active=False
+        Employee.total_employees-=1
+        Employee.departments[self._department]-=1
 
     @staticmethod
+    @hot_path
     def is_valid_department(department):
-        print("department",department)
-        print("Employee.departments",Employee.departments)
-        print("department in Employee.departments",department in Employee.departments)
         return department in Employee.departments
     
     @staticmethod
+    @hot_path
     def valid_email(email):
-        pattern = r"^[\w\.-]+@[\w\.-]+\.\w+$"
-        return bool(re.match(pattern, email))
+        return Employee.email_validator.is_valid(email)
     
     @staticmethod
     def calculate_tax(salary,country):
@@ -48,55 +445,194 @@ class Employee:
     
     @staticmethod
     def generate_employee_id():
-        year=datetime.now().year
-        eid=f"EMP-{year}-{Employee.next_employee_id:04d}"
-        Employee.next_employee_id+=1
-        return eid
+        return Employee.id_allocator.next_id()
     
     
 
     
-    @classmethod
-    def from_csv_data(cls,csv_line):
-        parts=csv_line
-        print("parts",parts)
-        print("len(parts)",len(parts))
+    @staticmethod
+    def parse_salary(value):
+        if not isinstance(value,str):
+            if isinstance(value,bool) or not isinstance(value,(int,float)):
+                raise ValueError("Invalid salary")
+            return value
+        try:
+            salary=float(value)
+        except ValueError:
+            raise ValueError("Invalid salary") from None
+        return int(salary) if salary.is_integer() else salary
+
+    @staticmethod
+    def parse_csv_line(csv_line):
+        if isinstance(csv_line,str):
+            parts=[field.strip() for field in next(csv.reader([csv_line]),[])]
+        else:
+            parts=list(csv_line)
         if len(parts)!=5:
             raise ValueError("Invalid CSV data")
-        
-        name,department,base_salary,country,email=parts
+        parts[2]=Employee.parse_salary(parts[2])
+        return parts
+
+    @classmethod
+    @hot_path
+    def from_csv_data(cls,csv_line):
+        name,department,base_salary,country,email=cls.parse_csv_line(csv_line)
         return cls(name,department,base_salary,country,email)
     
     
     @classmethod
     def department_stats(cls):
         return {dept:count for dept,count in cls.departments.items()}
+
+    @classmethod
+    def get_department_stats(cls):
+        return cls.department_statistics.snapshot()
     
     @classmethod
     def set_tax_rate(cls,country,rate):
         if country not in cls.tax_rates:
             raise ValueError("Invalid country")
         cls.tax_rates[country]=rate
+        cls.tax_rates_version+=1
+        cls.payroll_engine.clear()
+
+    @classmethod
+    def run_payroll(cls,employees,key=None):
+        return cls.payroll_engine.run(employees,key)
     
     @classmethod
     def hire_bulk_employees(cls,employee_lines):
-        print("employee_lines",employee_lines)
-        for line in employee_lines:
-            print("line",line)
-            cls.from_csv_data(line)
+        return [cls.from_csv_data(line) for line in employee_lines]
+
+    @classmethod
+    def import_csv(cls,source,chunk_size=10000,has_header=False,on_chunk=None):
+        # Streams rows from a path, open file or iterable of lines. Each chunk is
+        # validated as a batch, gets one contiguous block of employee IDs and
+        # updates the class-level counters once. Hired employees are passed to
+        # on_chunk, or collected in the report when no callback is given.
+        started=time.perf_counter()
+        report={"rows":0,"imported":0,"rejected":[]}
+        if on_chunk is None:
+            report["employees"]=[]
+            on_chunk=report["employees"].extend
+
+        opener=open(source,newline="") if isinstance(source,str) else nullcontext(source)
+        with opener as handle:
+            reader=csv.reader(handle)
+            line_number=1
+            if has_header:
+                next(reader,None)
+                line_number+=1
+            while True:
+                rows=list(islice(reader,chunk_size))
+                if not rows:
+                    break
+                hired=cls._import_chunk(rows,line_number,report["rejected"])
+                report["rows"]+=len(rows)
+                report["imported"]+=len(hired)
+                line_number+=len(rows)
+                if hired:
+                    on_chunk(hired)
+
+        report["seconds"]=time.perf_counter()-started
+        report["rows_per_second"]=report["rows"]/report["seconds"] if report["seconds"] else 0.0
+        return report
+
+    @classmethod
+    def _import_chunk(cls,rows,first_line,rejected):
+        parsed=[]
+        for line_number,row in enumerate(rows,first_line):
+            try:
+                parsed.append((line_number,row,cls.parse_csv_line([field.strip() for field in row])))
+            except ValueError as error:
+                rejected.append((line_number,row,str(error)))
+
+        departments=Employee.departments
+        email_ok=Employee.email_validator.validate_many([fields[4] for _,_,fields in parsed])
+        valid=[]
+        for (line_number,row,fields),ok in zip(parsed,email_ok):
+            if fields[1] not in departments:
+                rejected.append((line_number,row,"Invalid department"))
+            elif not ok:
+                rejected.append((line_number,row,"Invalid email"))
+            else:
+                valid.append(fields)
+        if not valid:
+            return []
+
+        employee_ids=Employee.id_allocator.reserve_ids(len(valid))
+        hire_date=datetime.now()
+        hired=[]
+        for employee_id,(name,department,base_salary,country,email) in zip(employee_ids,valid):
+            employee=cls.__new__(cls)
+            employee._set_fields(name,department,base_salary,country,email,hire_date)
+            employee.employee_id=employee_id
+            hired.append(employee)
+
+        Employee.department_statistics.record_hires(hired)
+        Employee.total_employees+=len(hired)
+        for department,count in Counter(fields[1] for fields in valid).items():
+            departments[department]+=count
+        for employee in hired:
+            employee._active=True
+        return hired
 
 
     
-    def add_performance_rating(self,rating):
+    def add_performance_rating(self,rating,rated_at=None):
         if rating<1 or rating>5:
             raise ValueError("Invalid rating")
-        self.performance_ratings.append(rating)
-    
-    def get_average_performance(self):
-        if not self.performance_ratings:
+        rated_at=rated_at or datetime.now()
+        if self._rating_times and rated_at<self._rating_times[-1]:
+            raise ValueError("Ratings must be added in chronological order")
+        list.append(self._performance_ratings,rating)
+        self._rating_times.append(rated_at)
+        self._rating_totals.append(self._rating_totals[-1]+rating)
+        if self._active:
+            Employee.department_statistics.record_rating(self._department,rating)
+
+    @property
+    def performance_ratings(self):
+        # Ratings change only through add_performance_rating (which
+        # RatingList.append uses) or by assigning a whole new list.
+        return self._performance_ratings
+
+    @performance_ratings.setter
+    def performance_ratings(self,ratings):
+        ratings=list(ratings)
+        self._replace_ratings(ratings,[self.hire_date]*len(ratings))
+
+    def _replace_ratings(self,ratings,rated_at):
+        if any(rating<1 or rating>5 for rating in ratings):
+            raise ValueError("Invalid rating")
+        totals=[0.0]
+        for rating in ratings:
+            totals.append(totals[-1]+rating)
+        if self._active:
+            old_total,old_count=self._rating_summary()
+            Employee.department_statistics.record_rating(self._department,totals[-1]-old_total,len(ratings)-old_count)
+        self._performance_ratings=RatingList(self,ratings)
+        self._rating_times=list(rated_at)
+        self._rating_totals=totals
+
+    def _rating_summary(self):
+        # _rating_totals[i] is the sum of the first i ratings.
+        return self._rating_totals[-1],len(self._rating_totals)-1
+
+    def get_average_performance(self,last_n=None,months=None):
+        totals=self._rating_totals
+        count=len(totals)-1
+        start=0
+        if last_n is not None:
+            start=max(count-last_n,0)
+        if months is not None:
+            cutoff=datetime.now()-timedelta(days=months*365/12)
+            start=max(start,bisect_left(self._rating_times,cutoff))
+        if start>=count:
             return 0
-        return sum(self.performance_ratings)/len(self.performance_ratings)
+        return (totals[count]-totals[start])/(count-start)
     
+    @hot_path
     def calculate_net_salary(self):
         tax=Employee.calculate_tax(self.base_salary,self.country)
         return round(self.base_salary-tax,2)
@@ -109,56 +645,146 @@ class Employee:
 
     def is_eligible_for_bonus(self):
         return self.get_average_performance()>=3.5 and self.get_years_of_service()>=1
+
+    @classmethod
+    def bonus_eligibility(cls,employees,as_of=None,min_average=3.5,min_years=1):
+        as_of=as_of or datetime.now()
+        eligible=[]
+        for employee in employees:
+            totals=employee._rating_totals
+            count=len(totals)-1
+            eligible.append(count>0 and totals[count]/count>=min_average and (as_of-employee.hire_date).days//365>=min_years)
+        return eligible
+
+
+Employee.id_allocator=EmployeeIdAllocator(ClassAttributeSequence(Employee,"next_employee_id"))
+Employee.payroll_engine=PayrollEngine()
+Employee.department_statistics=DepartmentStats(Employee.departments)
     
 
 
-emp1=Employee("John Doe","Engineering",50000,"USA","john.doe@example.com")
-assert emp1.employee_id.startswith("EMP-2025-")
-assert Employee.total_employees==1
-assert Employee.departments["Engineering"]==1
+if __name__ == "__main__":
+    emp1=Employee("John Doe","Engineering",50000,"USA","john.doe@example.com")
+    assert emp1.employee_id.startswith(f"EMP-{datetime.now().year}-")
+    assert Employee.total_employees==1
+    assert Employee.departments["Engineering"]==1
+
+
+    print(Employee.valid_email("test@company.com"))
+    assert Employee.valid_email("test@company.com")==True
+    assert Employee.valid_email("invalid-email")==False
+    assert Employee.is_valid_department("Engineering")==True
+    assert Employee.is_valid_department("Invalid")==False
+    assert abs(Employee.calculate_tax(100000,"USA")-22000)<0.01
+
+
+
+    emp2=Employee.from_csv_data("Sarah Johnson,HR,45000,India,sarah.johnson@example.com")
+    assert emp2.name=="Sarah Johnson"
+    assert emp2.department=="HR"
+    assert Employee.departments["HR"]==1
+
+
+    bulk_data=[
+        ["Milk Wilson", "Engineering", 65000, "India", "mike.w@globaltech.com"],
+        ["Lisa Chen", "HR", 70000, "USA", "lisa.chen@globaltech.com"]
+    ]   
+
+    Employee.hire_bulk_employees(bulk_data)
+    assert Employee.total_employees==4
+
+
+    stats=Employee.get_department_stats()
+    assert stats["Engineering"]["count"]==2
+    assert stats['Sales']['count']==0
+
+
+    emp1.add_performance_rating(4.2)
+    emp1.add_performance_rating(3.8)
+    emp1.add_performance_rating(4.5)
+    assert abs(emp1.get_average_performance()-4.17)<0.01
+
+
+    emp1.hire_date=datetime.now()-timedelta(days=800)
+    assert emp1.get_years_of_service()>=2
+    assert emp1.is_eligible_for_bonus()==True
+
+
+    net_salary=emp1.calculate_net_salary()
+    expected_net=50000 - (50000*0.22)
+    assert abs(net_salary-expected_net)<0.01
 
 
-print(Employee.valid_email("test@company.com"))
-assert Employee.valid_email("test@company.com")==True
-assert Employee.valid_email("invalid-email")==False
-assert Employee.is_valid_department("Engineering")==True
-assert Employee.is_valid_department("Invalid")==False
-assert abs(Employee.calculate_tax(100000,"USA")-22000)<0.01
 
+    import_report=Employee.import_csv([
+        "Ravi Kumar,Sales,52000,India,ravi.kumar@globaltech.com",
+        "Broken Row,Sales",
+        "Anna Berg,Finance,61000,UK,anna.berg@globaltech.com",
+    ],chunk_size=2)
+    assert import_report["imported"]==1
+    assert [line for line,_,_ in import_report["rejected"]]==[2,3]
+    assert import_report["employees"][0].base_salary==52000
 
 
-emp2=Employee.from_csv_data("Sarah Johnson,HR,45000,India,sarah.johnson@example.com")
-assert emp2.name=="Sarah Johnson"
-assert emp2.department=="HR"
-assert Employee.departments["HR"]==1
+    validator=EmailValidator(allowed_domains=["globaltech.com"])
+    assert validator.validate_many(["a.b@globaltech.com","a.b@GlobalTech.com","x@other.org","not-an-email"])==[True,True,False,False]
+    validator.block_domains("globaltech.com")
+    assert validator.is_valid("a.b@globaltech.com")==False
 
 
-bulk_data=[
-    ["Milk Wilson", "Engineering", 65000, "India", "mike.w@globaltech.com"],
-    ["Lisa Chen", "HR", 70000, "USA", "lisa.chen@globaltech.com"]
-]   
+    allocator=EmployeeIdAllocator(SharedCounterSequence(start=9999),block_size=4)
+    assert allocator.next_id().endswith("-9999")
+    assert allocator.next_id().endswith("-10000")
+    assert len(set(allocator.reserve_ids(100)))==100
 
-Employee.hire_bulk_employees(bulk_data)
-assert Employee.total_employees==4
 
+    payroll=Employee.run_payroll([emp1,emp2],key="demo")
+    assert list(payroll.net)==[emp1.calculate_net_salary(),emp2.calculate_net_salary()]
+    assert Employee.run_payroll([emp1,emp2],key="demo") is payroll
+    Employee.set_tax_rate("India",0.2)
+    assert Employee.run_payroll([emp1,emp2],key="demo") is not payroll
+    emp1.base_salary=90000
+    assert Employee.run_payroll([emp1,emp2],key="demo").gross[0]==90000
+    assert Employee.run_payroll([emp2],key="demo").employee_ids==[emp2.employee_id]
 
-stats=Employee.get_department_stats()
-assert stats["Engineering"]["count"]==1
-assert stats['Sales']['count']==1
 
+    assert abs(emp1.get_average_performance(last_n=2)-4.15)<0.01
+    assert emp1.get_average_performance(months=12)==emp1.get_average_performance()
+    assert Employee.bonus_eligibility([emp1,emp2])==[True,False]
 
-emp1.add_performance_rating(4.2)
-emp1.add_performance_rating(3.8)
-emp1.add_performance_rating(4.5)
-assert abs(emp1.get_average_performance()-4.17)<0.01
 
+    snapshot=Employee.get_department_stats()
+    emp2.base_salary=50000
+    emp2.department="Marketing"
+    assert Employee.get_department_stats()["Marketing"]["count"]==snapshot["Marketing"]["count"]+1
+    assert Employee.get_department_stats()["HR"]["total_salary"]==snapshot["HR"]["total_salary"]-45000
+    emp2.terminate()
+    assert Employee.get_department_stats()["Marketing"]==snapshot["Marketing"]
 
-emp1.hire_date=datetime.now()-timedelta(days=800)
-assert emp1.get_years_of_service()>=2
-assert emp1.is_eligible_for_bonus()==True
 
+    emp3=Employee("Nora Diaz","HR",48000,"UK","nora.diaz@globaltech.com")
+    emp3.performance_ratings=[5,4]
+    emp3.performance_ratings.append(3)
+    assert emp3.performance_ratings==[5,4,3] and emp3.get_average_performance()==4
+    emp3.performance_ratings.extend([4])
+    assert Employee.get_department_stats()["HR"]["average_performance"]==emp3.get_average_performance()==4
+    emp3.department="Sales"
+    assert Employee.get_department_stats()["HR"]["average_performance"]==0
 
-net_salary=emp1.calculate_net_salary()
-expected_net=85000 - (85000*0.22)
-assert abs(net_salary-expected_net)<0.01
 
+    snapshot=Employee.get_department_stats()
+    total=Employee.total_employees
+    for bad_salary in ("5k",None):
+        try:
+            Employee("Carl Dunn","Sales",bad_salary,"USA","carl.dunn@globaltech.com")
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("expected an invalid salary to be rejected")
+    try:
+        emp3.base_salary="300 USD"
+    except ValueError:
+        pass
+    assert Employee.total_employees==total and Employee.get_department_stats()==snapshot
+    emp3.base_salary="52000"
+    assert emp3.base_salary==52000 and Employee.get_department_stats()["Sales"]["total_salary"]==snapshot["Sales"]["total_salary"]+4000
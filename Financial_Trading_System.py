@@ -1,58 +1,804 @@
+import asyncio
+import heapq
+import itertools
+import json
+import math
+import mmap
+import operator
+import os
 import random
-from typing import Dict, List
+import struct
+import threading
+import time
+import weakref
+from array import array
+from bisect import bisect_left, insort
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from Instrumentation import hot_path
 
 class TradingAccount:
+    # Set by Ledger.open_account; balance changes of a registered account are
+    # journaled by that ledger.
+    ledger: Optional["Ledger"] = None
+
     def __init__(self, account_id: str, owner_name: str, balance: float):
         self.account_id = account_id
         self.owner_name = owner_name
         self.balance = balance
+        self.positions: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def __getstate__(self) -> Dict:
+        # The lock cannot be pickled, and a copy is not registered with the
+        # original's ledger, so both are left out and the copy starts detached.
+        state = self.__dict__.copy()
+        del state["lock"]
+        state.pop("ledger", None)
+        return state
 
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    @hot_path
     def deposit(self, amount: float) -> bool:
         if amount > 0:
-            self.balance += amount
-            return True
+            return post_balances([(self, amount)], "deposit")
         return False
 
+    @hot_path
     def withdraw(self, amount: float) -> bool:
-        if 0 < amount <= self.balance:
-            self.balance -= amount
-            return True
+        if amount > 0:
+            return post_balances([(self, -amount)], "withdraw")
         return False
 
+    def place_order(self, engine: "MatchingEngine", symbol: str, side: str, quantity: int,
+                    price: Optional[float] = None) -> Dict:
+        return engine.submit_order(self, symbol, side, quantity, price)
+
+
+def post_balances(postings: List[Tuple[TradingAccount, float]], reference: str = "") -> bool:
+    # Applies (account, delta) balance changes all-or-nothing: rejected if any
+    # balance would go negative. The accounts' locks are taken in account_id
+    # order, the same order Ledger uses, and changes to accounts registered
+    # with a ledger are journaled there before they are applied.
+    if len(postings) == 1:
+        account, delta = postings[0]
+        with account.lock:
+            if account.balance + delta < 0:
+                return False
+            if account.ledger is not None:
+                account.ledger._journal_postings([(account, delta)], reference)
+            account.balance += delta
+        return True
+
+    deltas: Dict[int, List] = {}
+    for account, delta in postings:
+        entry = deltas.get(id(account))
+        if entry is None:
+            deltas[id(account)] = [account, delta]
+        else:
+            entry[1] += delta
+    accounts = sorted(deltas.values(), key=lambda entry: entry[0].account_id)
+    for account, _ in accounts:
+        account.lock.acquire()
+    try:
+        if any(account.balance + delta < 0 for account, delta in accounts):
+            return False
+        by_ledger: Dict[int, List] = {}
+        for account, delta in accounts:
+            if account.ledger is not None:
+                by_ledger.setdefault(id(account.ledger), []).append((account, delta))
+        for changes in by_ledger.values():
+            changes[0][0].ledger._journal_postings(changes, reference)
+        for account, delta in accounts:
+            account.balance += delta
+    finally:
+        for account, _ in reversed(accounts):
+            account.lock.release()
+    return True
+
+
+class RollingWindow:
+    # Running sums over the last `size` tick returns and the short/long moving
+    # average windows, so every metric is an O(1) read. Sums are recomputed
+    # from the windows every `resync_every` updates to bound float drift.
+    resync_every = 4096
+
+    def __init__(self, size: int = 200, short_window: int = 20, long_window: int = 50):
+        self.size = size
+        self.short_window = short_window
+        self.long_window = long_window
+        self.returns: deque = deque()
+        self.short_prices: deque = deque()
+        self.long_prices: deque = deque()
+        self.return_sum = 0.0
+        self.return_square_sum = 0.0
+        self.short_sum = 0.0
+        self.long_sum = 0.0
+        self.last_price: Optional[float] = None
+        self.updates = 0
+
+    def update(self, price: float) -> None:
+        last_price = self.last_price
+        if last_price:
+            change = price / last_price - 1
+            self.returns.append(change)
+            self.return_sum += change
+            self.return_square_sum += change * change
+            if len(self.returns) > self.size:
+                old = self.returns.popleft()
+                self.return_sum -= old
+                self.return_square_sum -= old * old
+        self.short_prices.append(price)
+        self.short_sum += price
+        if len(self.short_prices) > self.short_window:
+            self.short_sum -= self.short_prices.popleft()
+        self.long_prices.append(price)
+        self.long_sum += price
+        if len(self.long_prices) > self.long_window:
+            self.long_sum -= self.long_prices.popleft()
+        self.last_price = price
+        self.updates += 1
+        if self.updates % self.resync_every == 0:
+            self.return_sum = math.fsum(self.returns)
+            self.return_square_sum = math.fsum(r * r for r in self.returns)
+            self.short_sum = math.fsum(self.short_prices)
+            self.long_sum = math.fsum(self.long_prices)
+
+    def volatility(self) -> float:
+        count = len(self.returns)
+        if count < 2:
+            return 0.0
+        variance = (self.return_square_sum - self.return_sum * self.return_sum / count) / (count - 1)
+        return math.sqrt(variance) if variance > 0 else 0.0
+
+    def trend(self) -> Dict[str, str]:
+        if len(self.long_prices) < self.long_window:
+            return {"trend": "sideways", "confidence": "0%"}
+        spread = (self.short_sum / len(self.short_prices)) / (self.long_sum / len(self.long_prices)) - 1
+        if spread > 0.001:
+            trend = "upward"
+        elif spread < -0.001:
+            trend = "downward"
+        else:
+            trend = "sideways"
+        return {"trend": trend, "confidence": f"{min(99, int(50 + abs(spread) * 5000))}%"}
+
+    def metrics(self) -> Dict:
+        count = len(self.returns)
+        return {
+            "last_price": self.last_price,
+            "mean_return": self.return_sum / count if count else 0.0,
+            "volatility": self.volatility(),
+            "short_ma": self.short_sum / len(self.short_prices) if self.short_prices else None,
+            "long_ma": self.long_sum / len(self.long_prices) if self.long_prices else None,
+            **self.trend(),
+        }
+
+
+async def replay_ticks(path: str, delay: float = 0.0) -> AsyncIterator[Tuple[str, float]]:
+    with open(path) as handle:
+        for line in handle:
+            symbol, _, price = line.strip().partition(",")
+            if symbol and price:
+                yield symbol, float(price)
+                if delay:
+                    await asyncio.sleep(delay)
+
+
+async def generated_ticks(symbols: List[str], count: int, seed: int = 0, start_price: float = 100.0,
+                          volatility: float = 0.01) -> AsyncIterator[Tuple[str, float]]:
+    rng = random.Random(seed)
+    prices = {symbol: start_price for symbol in symbols}
+    for i in range(count):
+        symbol = symbols[i % len(symbols)]
+        prices[symbol] *= 1 + rng.gauss(0, volatility)
+        yield symbol, prices[symbol]
+        if i % 1000 == 999:
+            await asyncio.sleep(0)
+
+
+class MarketDataPipeline:
+    # Fans ticks out to `workers` consumer tasks, each owning a bounded queue.
+    # A symbol always maps to the same queue so its ticks stay in order, and
+    # the producer awaits on a full queue, which throttles the source.
+    def __init__(self, window: int = 200, short_window: int = 20, long_window: int = 50,
+                 workers: int = 4, queue_size: int = 1024):
+        self.window = window
+        self.short_window = short_window
+        self.long_window = long_window
+        self.workers = workers
+        self.queue_size = queue_size
+        self.windows: Dict[str, RollingWindow] = {}
+        self.ticks_processed = 0
+
+    def ingest(self, symbol: str, price: float) -> None:
+        window = self.windows.get(symbol)
+        if window is None:
+            window = self.windows[symbol] = RollingWindow(self.window, self.short_window, self.long_window)
+        window.update(price)
+        self.ticks_processed += 1
+
+    async def run(self, source: AsyncIterator[Tuple[str, float]]) -> int:
+        # Every blocking put also waits on the consumers, so a consumer that
+        # fails stops the producer instead of leaving it blocked on a full
+        # queue. The remaining consumers are cancelled and the error re-raised.
+        queues = [asyncio.Queue(self.queue_size) for _ in range(self.workers)]
+        consumers = [asyncio.create_task(self._consume(queue)) for queue in queues]
+        produced = 0
+        try:
+            async for symbol, price in source:
+                tick = (symbol, self._validate_price(symbol, price))
+                queue = queues[hash(symbol) % self.workers]
+                try:
+                    queue.put_nowait(tick)
+                except asyncio.QueueFull:
+                    await self._put(queue, tick, consumers)
+                produced += 1
+            for queue in queues:
+                await self._put(queue, None, consumers)
+            await asyncio.gather(*consumers)
+        except BaseException:
+            for consumer in consumers:
+                consumer.cancel()
+            await asyncio.gather(*consumers, return_exceptions=True)
+            if hasattr(source, "aclose"):
+                await source.aclose()
+            raise
+        return produced
+
+    @staticmethod
+    def _validate_price(symbol: str, price) -> float:
+        try:
+            value = float(price)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid price for {symbol}: {price!r}") from None
+        if not math.isfinite(value) or value <= 0:
+            raise ValueError(f"Invalid price for {symbol}: {price!r}")
+        return value
+
+    @staticmethod
+    async def _put(queue: asyncio.Queue, item, consumers: List[asyncio.Task]) -> None:
+        put = asyncio.ensure_future(queue.put(item))
+        done, _ = await asyncio.wait([put, *consumers], return_when=asyncio.FIRST_COMPLETED)
+        if put in done:
+            return
+        put.cancel()
+        for consumer in done:
+            consumer.result()
+        raise RuntimeError("Market data consumer stopped before the end of the stream")
+
+    async def _consume(self, queue: asyncio.Queue) -> None:
+        ingest = self.ingest
+        while True:
+            tick = await queue.get()
+            while tick is not None:
+                ingest(*tick)
+                try:
+                    tick = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+            else:
+                return
+
+    def trend(self, symbol: str) -> Dict[str, str]:
+        window = self.windows.get(symbol)
+        return window.trend() if window else {"trend": "sideways", "confidence": "0%"}
+
+    def volatility(self, symbol: str) -> float:
+        window = self.windows.get(symbol)
+        return window.volatility() if window else 0.0
+
+    def last_price(self, symbol: str) -> Optional[float]:
+        window = self.windows.get(symbol)
+        return window.last_price if window else None
+
 
 class RiskManagement:
-    def assess_portfolio_risk(self) -> str:
+    market_data: Optional[MarketDataPipeline] = None
+    risk_thresholds = (0.01, 0.03)
 
-        risk_score = random.uniform(0, 1)
-        if risk_score < 0.3:
+    def assess_portfolio_risk(self) -> str:
+        # Exposure-weighted tick volatility of the held positions.
+        market_data = self.market_data
+        positions = getattr(self, "positions", {})
+        exposure = weighted = 0.0
+        if market_data is not None:
+            for symbol, quantity in positions.items():
+                price = market_data.last_price(symbol)
+                if price and quantity:
+                    value = abs(quantity * price)
+                    exposure += value
+                    weighted += value * market_data.volatility(symbol)
+        risk_score = weighted / exposure if exposure else 0.0
+        if risk_score < self.risk_thresholds[0]:
             return 'Low'
-        elif risk_score < 0.7:
+        elif risk_score < self.risk_thresholds[1]:
             return 'Medium'
         else:
             return 'High'
 
 class AnalyticsEngine:
+    market_data: Optional[MarketDataPipeline] = None
+
     def analyze_market_trend(self, symbol: str) -> Dict[str, str]:
-        trends = ['upward', 'downward', 'sideways']
-        return {
-            "trend": random.choice(trends),
-            "confidence": f"{random.randint(70, 99)}%"
-        }
+        if self.market_data is None:
+            return {"trend": "sideways", "confidence": "0%"}
+        return self.market_data.trend(symbol)
 
 class NotificationSystem:
+    # Unfired alerts are kept per asset in two sorted lists. "above" alerts are
+    # keyed by -target and "below" alerts by target, so the alerts crossed by a
+    # tick are always a suffix: one bisect finds them and one slice removes them.
     def __init__(self):
-        self.alerts = []
+        self._alerts_above: Dict[str, List] = {}
+        self._alerts_below: Dict[str, List] = {}
+        self._alert_sequence = 0
+        self.triggered_notifications: List[Dict] = []
 
     def set_price_alert(self, asset: str, target_price: float, condition: str) -> bool:
-        self.alerts.append({
+        alert = {
             "asset": asset,
             "target_price": target_price,
             "condition": condition
-        })
+        }
+        self._alert_sequence += 1
+        if condition == "above":
+            insort(self._alerts_above.setdefault(asset, []), (-target_price, self._alert_sequence, alert))
+        elif condition == "below":
+            insort(self._alerts_below.setdefault(asset, []), (target_price, self._alert_sequence, alert))
+        else:
+            return False
         return True
 
+    @property
+    def alerts(self) -> List[Dict]:
+        # Read-only replacement for the former public list: unfired alerts in
+        # the order they were set.
+        entries = itertools.chain.from_iterable(itertools.chain(self._alerts_above.values(), self._alerts_below.values()))
+        return [alert for _, _, alert in sorted(entries, key=operator.itemgetter(1))]
+
     def get_pending_notifications(self) -> List[Dict]:
-        return self.alerts
+        pending = []
+        for alerts in itertools.chain(self._alerts_above.values(), self._alerts_below.values()):
+            pending.extend(alert for _, _, alert in alerts)
+        return pending
+
+    def get_triggered_notifications(self, clear: bool = False) -> List[Dict]:
+        triggered = self.triggered_notifications
+        if clear:
+            self.triggered_notifications = []
+        return triggered
+
+    def on_price_tick(self, asset: str, price: float) -> List[Dict]:
+        return self._fire_alerts(asset, price, price)
+
+    def process_ticks(self, ticks: Iterable[Tuple[str, float]]) -> List[Dict]:
+        ranges: Dict[str, List[float]] = {}
+        for asset, price in ticks:
+            seen = ranges.get(asset)
+            if seen is None:
+                ranges[asset] = [price, price]
+            elif price > seen[0]:
+                seen[0] = price
+            elif price < seen[1]:
+                seen[1] = price
+        fired = []
+        for asset, (high, low) in ranges.items():
+            fired.extend(self._fire_alerts(asset, high, low))
+        return fired
+
+    def _fire_alerts(self, asset: str, high: float, low: float) -> List[Dict]:
+        fired = []
+        above = self._alerts_above.get(asset)
+        if above:
+            start = bisect_left(above, (-high,))
+            fired.extend(dict(alert, triggered_price=high) for _, _, alert in above[start:])
+            del above[start:]
+        below = self._alerts_below.get(asset)
+        if below:
+            start = bisect_left(below, (low,))
+            fired.extend(dict(alert, triggered_price=low) for _, _, alert in below[start:])
+            del below[start:]
+        self.triggered_notifications.extend(fired)
+        return fired
+
+class Order:
+    __slots__ = ("order_id", "account", "symbol", "side", "price", "quantity", "remaining", "reserved", "status")
+
+    def __init__(self, order_id: int, account: TradingAccount, symbol: str, side: str, quantity: int,
+                 price: Optional[float]):
+        self.order_id = order_id
+        self.account = account
+        self.symbol = symbol
+        self.side = side
+        self.price = price
+        self.quantity = quantity
+        self.remaining = quantity
+        self.reserved = 0.0
+        self.status = "open"
+
+
+class OrderBook:
+    # Price-time priority book for one symbol. Each side is a heap keyed by
+    # (price, arrival sequence); cancelled orders get remaining == 0 and are
+    # dropped lazily when they reach the top.
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self._bids: List = []
+        self._asks: List = []
+        self._sequence = itertools.count()
+        self.orders: Dict[int, Order] = {}
+        self.last_price: Optional[float] = None
+
+    @staticmethod
+    def _peek(heap: List) -> Optional[Order]:
+        while heap and heap[0][2].remaining == 0:
+            heapq.heappop(heap)
+        return heap[0][2] if heap else None
+
+    def best_bid(self) -> Optional[float]:
+        order = self._peek(self._bids)
+        return order.price if order else None
+
+    def best_ask(self) -> Optional[float]:
+        order = self._peek(self._asks)
+        return order.price if order else None
+
+    def depth(self) -> Dict[str, int]:
+        return {
+            "bids": sum(order.remaining for _, _, order in self._bids),
+            "asks": sum(order.remaining for _, _, order in self._asks),
+        }
+
+    def rest(self, order: Order) -> None:
+        self.orders[order.order_id] = order
+        if order.side == "buy":
+            heapq.heappush(self._bids, (-order.price, next(self._sequence), order))
+        else:
+            heapq.heappush(self._asks, (order.price, next(self._sequence), order))
+
+    def match(self, order: Order) -> List[Dict]:
+        fills = []
+        buying = order.side == "buy"
+        heap = self._asks if buying else self._bids
+        while order.remaining:
+            resting = self._peek(heap)
+            if resting is None:
+                break
+            price = resting.price
+            if order.price is not None and (price > order.price if buying else price < order.price):
+                break
+            quantity = min(order.remaining, resting.remaining)
+            if buying and order.price is None:
+                quantity = min(quantity, int(order.account.balance // price))
+                if quantity == 0:
+                    break
+
+            buy_order, sell_order = (order, resting) if buying else (resting, order)
+            if not self._settle(buy_order, sell_order, price, quantity):
+                break
+            order.remaining -= quantity
+            resting.remaining -= quantity
+            resting.status = "filled" if resting.remaining == 0 else "partially_filled"
+            if resting.remaining == 0:
+                heapq.heappop(heap)
+                del self.orders[resting.order_id]
+            self.last_price = price
+            fills.append({
+                "symbol": self.symbol,
+                "price": price,
+                "quantity": quantity,
+                "buy_order_id": buy_order.order_id,
+                "sell_order_id": sell_order.order_id,
+            })
+        if fills:
+            order.status = "filled" if order.remaining == 0 else "partially_filled"
+        return fills
+
+    def _settle(self, buy_order: Order, sell_order: Order, price: float, quantity: int) -> bool:
+        # Only a market buy can fail here, if the buyer's balance dropped
+        # since the fill size was computed.
+        buyer = buy_order.account
+        notional = price * quantity
+        if buy_order.price is None:
+            buyer_delta = -notional
+            reserved = 0.0
+        else:
+            held = buy_order.price * quantity
+            reserved = buy_order.reserved - held
+            buyer_delta = held - notional
+            if buy_order.remaining == quantity:
+                buyer_delta += reserved
+                reserved = 0.0
+        reference = f"fill {buy_order.order_id}/{sell_order.order_id}"
+        if not post_balances([(buyer, buyer_delta), (sell_order.account, notional)], reference):
+            return False
+        buy_order.reserved = reserved
+        with buyer.lock:
+            buyer.positions[self.symbol] = buyer.positions.get(self.symbol, 0) + quantity
+        return True
+
+
+class MatchingEngine:
+    # Routes orders to one OrderBook per symbol. Limit buys hold their full
+    # cost from the balance and sells hold the shares from the position until
+    # they fill or are cancelled, so an account can never overspend or
+    # oversell. Market orders fill immediately and any unfilled rest is
+    # released (immediate-or-cancel).
+    def __init__(self):
+        self.books: Dict[str, OrderBook] = {}
+        self._order_ids = itertools.count(1)
+
+    def book(self, symbol: str) -> OrderBook:
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = OrderBook(symbol)
+        return book
+
+    @hot_path
+    def submit_order(self, account: TradingAccount, symbol: str, side: str, quantity: int,
+                     price: Optional[float] = None) -> Dict:
+        if side not in ("buy", "sell"):
+            return self._rejected(account, symbol, "Invalid side")
+        if not isinstance(quantity, int) or quantity <= 0:
+            return self._rejected(account, symbol, "Invalid quantity")
+        if price is not None and price <= 0:
+            return self._rejected(account, symbol, "Invalid price")
+
+        order = Order(next(self._order_ids), account, symbol, side, quantity, price)
+        if side == "buy" and price is not None:
+            cost = price * quantity
+            if not post_balances([(account, -cost)], f"reserve {order.order_id}"):
+                return self._rejected(account, symbol, "Insufficient balance")
+            order.reserved = cost
+        elif side == "sell":
+            with account.lock:
+                held = account.positions.get(symbol, 0)
+                if quantity > held:
+                    return self._rejected(account, symbol, "Insufficient position")
+                account.positions[symbol] = held - quantity
+
+        book = self.book(symbol)
+        fills = book.match(order)
+        if order.remaining:
+            if price is None:
+                self._release(order)
+                order.status = "partially_filled" if fills else "cancelled"
+            else:
+                book.rest(order)
+        return self._report(order, fills)
+
+    def cancel_order(self, order_id: int) -> bool:
+        for book in self.books.values():
+            order = book.orders.pop(order_id, None)
+            if order is not None:
+                break
+        else:
+            return False
+        self._release(order)
+        order.remaining = 0
+        order.status = "cancelled"
+        return True
+
+    def _release(self, order: Order) -> None:
+        account = order.account
+        if order.side == "buy":
+            if order.reserved:
+                post_balances([(account, order.reserved)], f"release {order.order_id}")
+            order.reserved = 0.0
+        else:
+            with account.lock:
+                account.positions[order.symbol] = account.positions.get(order.symbol, 0) + order.remaining
+
+    @staticmethod
+    def _report(order: Order, fills: List[Dict]) -> Dict:
+        return {
+            "order_id": order.order_id,
+            "status": order.status,
+            "filled": order.quantity - order.remaining,
+            "remaining": order.remaining,
+            "fills": fills,
+            "balance": order.account.balance,
+            "position": order.account.positions.get(order.symbol, 0),
+        }
+
+    @staticmethod
+    def _rejected(account: TradingAccount, symbol: str, reason: str) -> Dict:
+        return {
+            "order_id": None,
+            "status": "rejected",
+            "reason": reason,
+            "filled": 0,
+            "fills": [],
+            "balance": account.balance,
+            "position": account.positions.get(symbol, 0),
+        }
+
+
+def benchmark_order_matching(n_orders: int = 100000, seed: int = 7) -> Dict[str, float]:
+    rng = random.Random(seed)
+    engine = MatchingEngine()
+    traders = [TradingAccount(f"BM{i:03d}", "Benchmark", 1e12) for i in range(10)]
+    for trader in traders:
+        trader.positions["AAPL"] = 10 ** 9
+    resting: List[int] = []
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(n_orders):
+        trader = rng.choice(traders)
+        roll = rng.random()
+        tick = time.perf_counter_ns()
+        if roll < 0.1 and resting:
+            engine.cancel_order(resting.pop(rng.randrange(len(resting))))
+        else:
+            side = "buy" if rng.random() < 0.5 else "sell"
+            price = None if roll > 0.95 else round(100 + rng.gauss(0, 1), 2)
+            result = engine.submit_order(trader, "AAPL", side, rng.randint(1, 100), price)
+            if result["remaining"] and price is not None:
+                resting.append(result["order_id"])
+        latencies.append(time.perf_counter_ns() - tick)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "orders": n_orders,
+        "seconds": elapsed,
+        "orders_per_second": n_orders / elapsed,
+        "p50_us": latencies[len(latencies) // 2] / 1000,
+        "p99_us": latencies[int(len(latencies) * 0.99)] / 1000,
+        "p999_us": latencies[int(len(latencies) * 0.999)] / 1000,
+    }
+
+
+class Ledger:
+    # Posts balance changes to registered accounts. A posting is a list of
+    # (account_id, delta) pairs applied all-or-nothing under the accounts' own
+    # locks, taken in account_id order so concurrent transfers cannot deadlock.
+    # Every accepted posting is appended to the journal before it is applied.
+    # Registered accounts also journal deposits, withdrawals and order
+    # settlements here (see post_balances), so Ledger.replay rebuilds the
+    # balances from the journal after a crash.
+    def __init__(self, journal_path: Optional[str] = None, fsync: bool = False):
+        self.accounts: Dict[str, TradingAccount] = {}
+        self.fsync = fsync
+        self._journal = open(journal_path, "a", encoding="utf-8") if journal_path else None
+        self._journal_lock = threading.Lock()
+
+    def open_account(self, account: TradingAccount) -> None:
+        if account.account_id in self.accounts or account.ledger is not None:
+            raise ValueError("Account already registered")
+        with account.lock:
+            self.accounts[account.account_id] = account
+            account.ledger = self
+            self._write_journal([{"type": "open", "account": account.account_id, "balance": account.balance}])
+
+    def _write_journal(self, entries: List[Dict]) -> None:
+        if self._journal is None:
+            return
+        with self._journal_lock:
+            self._journal.write("".join(json.dumps(entry) + "\n" for entry in entries))
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+
+    def _journal_postings(self, changes: List[Tuple[TradingAccount, float]], reference: str) -> None:
+        self._write_journal([{"type": "post", "postings": [[account.account_id, delta] for account, delta in changes],
+                              "reference": reference}])
+
+    def _locked(self, account_ids: Iterable[str]) -> List[threading.Lock]:
+        return [self.accounts[account_id].lock for account_id in sorted(set(account_ids))]
+
+    def _apply(self, postings: List[Tuple[str, float]], pending: Dict[str, float]) -> bool:
+        deltas: Dict[str, float] = {}
+        for account_id, amount in postings:
+            deltas[account_id] = deltas.get(account_id, 0.0) + amount
+        for account_id, delta in deltas.items():
+            if self.accounts[account_id].balance + pending.get(account_id, 0.0) + delta < 0:
+                return False
+        for account_id, delta in deltas.items():
+            pending[account_id] = pending.get(account_id, 0.0) + delta
+        return True
+
+    def post(self, postings: List[Tuple[str, float]], reference: str = "") -> bool:
+        return self.post_batch([postings], [reference])[0]
+
+    def post_batch(self, batch: List[List[Tuple[str, float]]], references: Optional[List[str]] = None) -> List[bool]:
+        # All locks for the batch are taken once and the accepted postings are
+        # journaled with a single write.
+        for postings in batch:
+            for account_id, _ in postings:
+                if account_id not in self.accounts:
+                    raise KeyError(f"Unknown account {account_id}")
+        if references is None:
+            references = [""] * len(batch)
+        elif len(references) != len(batch):
+            raise ValueError("references must match the batch length")
+        locks = self._locked(account_id for postings in batch for account_id, _ in postings)
+        for lock in locks:
+            lock.acquire()
+        try:
+            pending: Dict[str, float] = {}
+            accepted = [self._apply(postings, pending) for postings in batch]
+            self._write_journal([
+                {"type": "post", "postings": postings, "reference": reference}
+                for postings, reference, ok in zip(batch, references, accepted) if ok
+            ])
+            for account_id, delta in pending.items():
+                self.accounts[account_id].balance += delta
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+        return accepted
+
+    def transfer(self, source_id: str, target_id: str, amount: float, reference: str = "") -> bool:
+        if amount <= 0:
+            return False
+        return self.post([(source_id, -amount), (target_id, amount)], reference)
+
+    def close(self) -> None:
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    @staticmethod
+    def replay(journal_path: str) -> Dict[str, float]:
+        balances: Dict[str, float] = {}
+        with open(journal_path, encoding="utf-8") as handle:
+            for line in handle:
+                if not line.endswith("\n"):
+                    break  # torn final write from a crash
+                entry = json.loads(line)
+                if entry["type"] == "open":
+                    balances[entry["account"]] = entry["balance"]
+                else:
+                    for account_id, amount in entry["postings"]:
+                        balances[account_id] += amount
+        return balances
+
+
+def benchmark_ledger_contention(threads: int = 8, operations: int = 20000, accounts: int = 4) -> Dict[str, float]:
+    # Compares ledger transfers with the unsynchronized read-modify-write the
+    # account methods used before the ledger. Money is only moved between
+    # accounts, so any change in the total counts as a lost update.
+    def unsynchronized_transfer(source: TradingAccount, target: TradingAccount, amount: float) -> None:
+        if 0 < amount <= source.balance:
+            source.balance -= amount
+            target.balance = target.balance + amount
+
+    def run(label: str, transfer) -> Dict[str, float]:
+        book = [TradingAccount(f"{label}{i}", "Benchmark", 1000.0) for i in range(accounts)]
+        ledger = Ledger()
+        for account in book:
+            ledger.open_account(account)
+
+        def worker(seed: int) -> None:
+            rng = random.Random(seed)
+            for _ in range(operations // threads):
+                source, target = rng.sample(book, 2)
+                transfer(ledger, source, target, 1.0)
+
+        workers = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        return {
+            f"{label}_ops_per_second": operations / elapsed,
+            f"{label}_lost_amount": abs(1000.0 * accounts - math.fsum(a.balance for a in book)),
+            f"{label}_negative_balances": sum(1 for a in book if a.balance < 0),
+        }
+
+    result = run("unsynchronized", lambda ledger, source, target, amount: unsynchronized_transfer(source, target, amount))
+    result.update(run("ledger", lambda ledger, source, target, amount: ledger.transfer(source.account_id, target.account_id, amount)))
+    return result
+
 
 class StockTrader(TradingAccount, RiskManagement, AnalyticsEngine):
     def __init__(self, account_id: str, owner_name: str, balance: float):
@@ -72,7 +818,11 @@ class ProfessionalTrader(StockTrader, CryptoTrader):
         StockTrader.__init__(self, account_id, owner_name, balance)
         NotificationSystem.__init__(self)  
 
-    def execute_diversified_strategy(self, strategy: Dict) -> Dict:
+    default_prices = {"stock": 100, "crypto": 500}
+
+    @hot_path
+    def execute_diversified_strategy(self, strategy: Dict, engine: Optional[MatchingEngine] = None,
+                                     prices: Optional[Dict[str, float]] = None) -> Dict:
         stocks = strategy.get("stocks", [])
         crypto = strategy.get("crypto", [])
         allocation = strategy.get("allocation", {"stocks": 0.5, "crypto": 0.5})
@@ -81,74 +831,382 @@ class ProfessionalTrader(StockTrader, CryptoTrader):
         stock_allocation = self.balance * allocation.get("stocks", 0.5)
         crypto_allocation = self.balance * allocation.get("crypto", 0.5)
 
+        prices = prices or {}
+
         for s in stocks:
-            pos_size = int((stock_allocation / len(stocks)) // 100)
+            pos_size = int((stock_allocation / len(stocks)) // prices.get(s, self.default_prices["stock"]))
             positions.append({"asset": s, "type": "stock", "size": pos_size})
 
         for c in crypto:
-            pos_size = int((crypto_allocation / len(crypto)) // 500)
+            pos_size = int((crypto_allocation / len(crypto)) // prices.get(c, self.default_prices["crypto"]))
             positions.append({"asset": c, "type": "crypto", "size": pos_size})
 
-        return {
+        result = {
             "status": "executed",
             "positions": positions
         }
+        if engine is not None:
+            result["orders"] = [
+                self.place_order(engine, p["asset"], "buy", p["size"]) for p in positions if p["size"] > 0
+            ]
+        return result
 
 
+def _assess_shard(args: Tuple) -> Dict[str, List]:
+    positions, returns, confidence, thresholds = args
+    return PortfolioRiskEngine(confidence, thresholds).assess(positions, returns)
 
-stock_trader = StockTrader("ST001", "John Doe", 50000.0)
-crypto_trader = CryptoTrader("CT001", "Jane Smith", 25000.0)
-pro_trader = ProfessionalTrader("PT001", "Mike Johnson", 100000.0)
 
-mro_names = [cls.__name__ for cls in ProfessionalTrader.__mro__]
-assert "ProfessionalTrader" in mro_names
-assert "StockTrader" in mro_names
-assert "CryptoTrader" in mro_names
+class PortfolioRiskEngine:
+    # Scores many portfolios against one returns history. positions is an
+    # accounts x assets matrix of market values, returns a periods x assets
+    # matrix of simple returns. Each account's P&L series is built column by
+    # column over its non-zero positions only; large batches can be split
+    # across a process pool.
+    def __init__(self, confidence: float = 0.99, thresholds: Tuple[float, float] = (0.02, 0.05)):
+        self.confidence = confidence
+        self.thresholds = thresholds
+        self.z_score = NormalDist().inv_cdf(confidence)
 
-assert stock_trader.account_id == 'ST001'
-assert stock_trader.balance == 50000.0
+    @staticmethod
+    def positions_matrix(accounts: Iterable[TradingAccount], symbols: List[str],
+                         prices: Dict[str, float]) -> List[List[float]]:
+        return [[account.positions.get(symbol, 0) * prices[symbol] for symbol in symbols] for account in accounts]
 
-deposit_result = stock_trader.deposit(10000.0)
-assert stock_trader.balance == 60000.0
-assert deposit_result == True
+    def assess(self, positions: List[List[float]], returns: List[List[float]], workers: int = 1,
+               shard_size: int = 1000) -> Dict[str, List]:
+        if workers > 1 and len(positions) > shard_size:
+            shards = [(positions[i:i + shard_size], returns, self.confidence, self.thresholds)
+                      for i in range(0, len(positions), shard_size)]
+            result: Dict[str, List] = {"volatility": [], "historical_var": [], "parametric_var": [], "risk": []}
+            with ProcessPoolExecutor(workers) as pool:
+                for shard in pool.map(_assess_shard, shards):
+                    for key, values in shard.items():
+                        result[key].extend(values)
+            return result
 
-withdraw_result = stock_trader.withdraw(20000.0)
-assert stock_trader.balance == 40000.0
+        periods = len(returns)
+        columns = [array("d", column) for column in zip(*returns)]
+        tail_index = min(periods - 1, int((1 - self.confidence) * periods))
+        low, high = self.thresholds
+        volatility, historical_var, parametric_var, risk = [], [], [], []
+        for row in positions:
+            exposure = math.fsum(abs(value) for value in row)
+            pnl = [0.0] * periods
+            for column, value in zip(columns, row):
+                if value:
+                    pnl = list(map(operator.add, pnl, map(operator.mul, column, itertools.repeat(value))))
+            mean = math.fsum(pnl) / periods
+            sigma = math.sqrt(math.fsum((x - mean) ** 2 for x in pnl) / (periods - 1)) if periods > 1 else 0.0
+            var_hist = max(0.0, -sorted(pnl)[tail_index])
+            var_param = max(0.0, self.z_score * sigma - mean)
+            ratio = var_hist / exposure if exposure else 0.0
+            volatility.append(sigma / exposure if exposure else 0.0)
+            historical_var.append(var_hist)
+            parametric_var.append(var_param)
+            risk.append('Low' if ratio < low else 'Medium' if ratio < high else 'High')
+        return {"volatility": volatility, "historical_var": historical_var,
+                "parametric_var": parametric_var, "risk": risk}
 
-risk_level = stock_trader.assess_portfolio_risk()
-assert risk_level in ['Low', 'Medium', 'High']
 
-position_size = stock_trader.calculate_position_size("AAPL", 150.0)
-assert isinstance(position_size, int)
-assert position_size > 0
+class PriceHistory:
+    # Columnar price file: a small header (magic, bar count, JSON symbol list)
+    # followed by one float64 column per symbol. The file is memory-mapped, so
+    # column() is a zero-copy view and only the pages actually read are loaded.
+    # close() releases every view column() handed out; slices taken from those
+    # views keep the mapping alive until they are dropped, but the file is
+    # closed either way.
+    MAGIC = b"PHST0001"
 
-market_data = stock_trader.analyze_market_trend("AAPL")
-assert isinstance(market_data, dict)
-assert "trend" in market_data
-assert "confidence" in market_data
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.bars, header_size = struct.unpack_from("<8sQI", self._map, 0)
+        if magic != self.MAGIC:
+            raise ValueError("Not a price history file")
+        self.symbols: List[str] = json.loads(self._map[20:20 + header_size].decode("utf-8"))
+        self._data = memoryview(self._map)[self._data_offset(header_size):].cast("d")
+        self._index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self._views: Dict[int, weakref.ref] = {}
 
-alert_set = crypto_trader.set_price_alert("BTC", 45000, "above")
-assert alert_set == True
+    @staticmethod
+    def _data_offset(header_size: int) -> int:
+        return (20 + header_size + 7) // 8 * 8
 
-notifications = crypto_trader.get_pending_notifications()
-assert isinstance(notifications, list)
-assert len(notifications) > 0
+    @classmethod
+    def write(cls, path: str, columns: Dict[str, Iterable[float]], bars: int, chunk_size: int = 65536) -> None:
+        header = json.dumps(list(columns)).encode("utf-8")
+        with open(path, "wb") as handle:
+            handle.write(struct.pack("<8sQI", cls.MAGIC, bars, len(header)) + header)
+            handle.write(b"\0" * (cls._data_offset(len(header)) - 20 - len(header)))
+            for symbol, values in columns.items():
+                values = iter(values)
+                written = 0
+                while True:
+                    chunk = array("d", itertools.islice(values, chunk_size))
+                    if not chunk:
+                        break
+                    chunk.tofile(handle)
+                    written += len(chunk)
+                if written != bars:
+                    raise ValueError(f"Column {symbol} has {written} bars, expected {bars}")
 
+    def column(self, symbol: str) -> memoryview:
+        start = self._index[symbol] * self.bars
+        view = self._data[start:start + self.bars]
+        key = id(view)
+        self._views[key] = weakref.ref(view, lambda _, key=key: self._views.pop(key, None))
+        return view
 
-assert hasattr(pro_trader, 'assess_portfolio_risk')
-assert hasattr(pro_trader, 'analyze_market_trend')
-assert hasattr(pro_trader, 'set_price_alert')
+    def close(self) -> None:
+        try:
+            for ref in list(self._views.values()):
+                view = ref()
+                if view is not None:
+                    view.release()
+            self._views.clear()
+            self._data.release()
+            self._map.close()
+        except BufferError:
+            # A slice of a column is still alive; the mapping is unmapped
+            # when the last such slice is garbage collected.
+            pass
+        finally:
+            self._file.close()
 
-strategy_result = pro_trader.execute_diversified_strategy({
-    "stocks": ["AAPL", "GOOG"],
-    "crypto": ["BTC", "ETH"],
-    "allocation": {
-        "stocks": 0.7,
-        "crypto": 0.3
-    }
-})
+    def __enter__(self) -> "PriceHistory":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class Backtester:
+    # Replays a PriceHistory through ProfessionalTrader.execute_diversified_strategy,
+    # rebalancing every `rebalance_every` bars to the sizes it returns for the
+    # current equity and prices.
+    def __init__(self, history: PriceHistory, strategy: Dict, initial_balance: float = 100000.0,
+                 rebalance_every: int = 390):
+        self.history = history
+        self.strategy = strategy
+        self.initial_balance = initial_balance
+        self.rebalance_every = rebalance_every
+
+    def run(self) -> Dict:
+        symbols = list(self.strategy.get("stocks", [])) + list(self.strategy.get("crypto", []))
+        columns = [self.history.column(symbol) for symbol in symbols]
+        trader = ProfessionalTrader("BACKTEST", "Backtester", self.initial_balance)
+        holdings = [0] * len(symbols)
+        cash = self.initial_balance
+        equity = array("d")
+        traded = 0.0
+        trades = 0
+        for bar in range(self.history.bars):
+            prices = [column[bar] for column in columns]
+            if bar % self.rebalance_every == 0:
+                trader.balance = cash + math.fsum(map(operator.mul, holdings, prices))
+                plan = trader.execute_diversified_strategy(self.strategy, prices=dict(zip(symbols, prices)))
+                for i, position in enumerate(plan["positions"]):
+                    delta = position["size"] - holdings[i]
+                    if delta:
+                        cash -= delta * prices[i]
+                        traded += abs(delta * prices[i])
+                        holdings[i] = position["size"]
+                        trades += 1
+            equity.append(cash + math.fsum(map(operator.mul, holdings, prices)))
+
+        peak = max_drawdown = 0.0
+        for value in equity:
+            if value > peak:
+                peak = value
+            elif peak and (peak - value) / peak > max_drawdown:
+                max_drawdown = (peak - value) / peak
+        final_equity = equity[-1] if equity else self.initial_balance
+        average_equity = math.fsum(equity) / len(equity) if equity else self.initial_balance
+        return {
+            "final_equity": final_equity,
+            "total_return": final_equity / self.initial_balance - 1,
+            "max_drawdown": max_drawdown,
+            "turnover": traded / average_equity,
+            "trades": trades,
+            "equity_curve": equity,
+        }
+
+
+def _run_backtest_job(job: Tuple[str, Dict, float, int]) -> Dict:
+    path, strategy, initial_balance, rebalance_every = job
+    with PriceHistory(path) as history:
+        result = Backtester(history, strategy, initial_balance, rebalance_every).run()
+    del result["equity_curve"]
+    result["strategy"] = strategy
+    result["rebalance_every"] = rebalance_every
+    return result
+
+
+def run_parameter_sweep(path: str, strategies: List[Dict], rebalance_schedules: Iterable[int] = (390,),
+                        initial_balance: float = 100000.0, workers: int = 1) -> List[Dict]:
+    jobs = [(path, strategy, initial_balance, every) for strategy in strategies for every in rebalance_schedules]
+    if workers <= 1:
+        return [_run_backtest_job(job) for job in jobs]
+    with ProcessPoolExecutor(workers) as pool:
+        return list(pool.map(_run_backtest_job, jobs))
+
+
+if __name__ == "__main__":
+    stock_trader = StockTrader("ST001", "John Doe", 50000.0)
+    crypto_trader = CryptoTrader("CT001", "Jane Smith", 25000.0)
+    pro_trader = ProfessionalTrader("PT001", "Mike Johnson", 100000.0)
+
+    mro_names = [cls.__name__ for cls in ProfessionalTrader.__mro__]
+    assert "ProfessionalTrader" in mro_names
+    assert "StockTrader" in mro_names
+    assert "CryptoTrader" in mro_names
+
+    assert stock_trader.account_id == 'ST001'
+    assert stock_trader.balance == 50000.0
+
+    deposit_result = stock_trader.deposit(10000.0)
+    assert stock_trader.balance == 60000.0
+    assert deposit_result == True
+
+    withdraw_result = stock_trader.withdraw(20000.0)
+    assert stock_trader.balance == 40000.0
+
+    risk_level = stock_trader.assess_portfolio_risk()
+    assert risk_level in ['Low', 'Medium', 'High']
+
+    position_size = stock_trader.calculate_position_size("AAPL", 150.0)
+    assert isinstance(position_size, int)
+    assert position_size > 0
+
+    market_data = stock_trader.analyze_market_trend("AAPL")
+    assert isinstance(market_data, dict)
+    assert "trend" in market_data
+    assert "confidence" in market_data
+
+    alert_set = crypto_trader.set_price_alert("BTC", 45000, "above")
+    assert alert_set == True
+
+    notifications = crypto_trader.get_pending_notifications()
+    assert isinstance(notifications, list)
+    assert len(notifications) > 0
+
+
+    assert hasattr(pro_trader, 'assess_portfolio_risk')
+    assert hasattr(pro_trader, 'analyze_market_trend')
+    assert hasattr(pro_trader, 'set_price_alert')
+
+    strategy_result = pro_trader.execute_diversified_strategy({
+        "stocks": ["AAPL", "GOOG"],
+        "crypto": ["BTC", "ETH"],
+        "allocation": {
+            "stocks": 0.7,
+            "crypto": 0.3
+        }
+    })
+
+    assert strategy_result['status'] == 'executed'
+    assert len(strategy_result['positions']) > 0
+
+    engine = MatchingEngine()
+    seller = StockTrader("ST002", "Ann Lee", 0.0)
+    seller.positions["AAPL"] = 100
+    assert seller.place_order(engine, "AAPL", "sell", 60, 150.0)["status"] == "open"
+    assert seller.place_order(engine, "AAPL", "sell", 40, 155.0)["status"] == "open"
+    assert seller.place_order(engine, "AAPL", "sell", 1, 150.0)["status"] == "rejected"
+    fill = stock_trader.place_order(engine, "AAPL", "buy", 80, 160.0)
+    assert fill["status"] == "filled"
+    assert [(f["price"], f["quantity"]) for f in fill["fills"]] == [(150.0, 60), (155.0, 20)]
+    assert stock_trader.positions["AAPL"] == 80
+    assert abs(stock_trader.balance - (40000.0 - 60 * 150.0 - 20 * 155.0)) < 0.01
+    assert abs(seller.balance - (60 * 150.0 + 20 * 155.0)) < 0.01
+    bid = stock_trader.place_order(engine, "AAPL", "buy", 10, 140.0)
+    assert engine.cancel_order(bid["order_id"])
+    assert abs(stock_trader.balance - bid["balance"] - 1400.0) < 0.01
+    assert engine.book("AAPL").best_ask() == 155.0
+    crypto_trader.set_price_alert("BTC", 50000, "above")
+    crypto_trader.set_price_alert("BTC", 30000, "below")
+    assert crypto_trader.set_price_alert("BTC", 1, "sideways") == False
+    assert crypto_trader.on_price_tick("BTC", 44000) == []
+    fired = crypto_trader.process_ticks([("BTC", 46000), ("ETH", 3000), ("BTC", 29000)])
+    assert sorted(alert["target_price"] for alert in fired) == [30000, 45000]
+    assert [alert["target_price"] for alert in crypto_trader.get_pending_notifications()] == [50000]
+    assert len(crypto_trader.get_triggered_notifications()) == 2
+    pipeline = MarketDataPipeline(workers=2, queue_size=16)
+    assert asyncio.run(pipeline.run(generated_ticks(["AAPL", "BTC"], 2000, seed=1))) == 2000
 
-assert strategy_result['status'] == 'executed'
-assert len(strategy_result['positions']) > 0
+    async def bad_ticks():
+        for price in (101.0, 102.0, "bad"):
+            yield "AAPL", price
+    try:
+        asyncio.run(asyncio.wait_for(MarketDataPipeline(workers=2, queue_size=4).run(bad_ticks()), 5))
+        raise AssertionError("invalid tick was accepted")
+    except ValueError:
+        pass
+    stock_trader.market_data = pipeline
+    assert stock_trader.analyze_market_trend("AAPL")["trend"] in ['upward', 'downward', 'sideways']
+    assert 0 < pipeline.volatility("AAPL") < 0.02
+    assert stock_trader.assess_portfolio_risk() in ['Low', 'Medium', 'High']
+    risk_rng = random.Random(5)
+    history = [[risk_rng.gauss(0, 0.01), risk_rng.gauss(0, 0.04)] for _ in range(500)]
+    risk_engine = PortfolioRiskEngine(confidence=0.95)
+    risk = risk_engine.assess([[10000.0, 0.0], [0.0, 10000.0], [0.0, 0.0]], history)
+    assert risk["risk"] == ['Low', 'High', 'Low']
+    assert risk["historical_var"][1] > risk["historical_var"][0] > 0
+    sharded = risk_engine.assess([[10000.0, 0.0], [0.0, 10000.0]] * 3, history, workers=2, shard_size=2)
+    assert sharded["risk"] == ['Low', 'High'] * 3
+    import copy
+    import pickle
+    import tempfile
+    history_path = os.path.join(tempfile.mkdtemp(), "prices.bin")
+    PriceHistory.write(history_path, {
+        "AAPL": (100 + bar * 0.1 for bar in range(1000)),
+        "BTC": (500 - bar * 0.2 for bar in range(1000)),
+    }, bars=1000)
+    with PriceHistory(history_path) as history:
+        backtest = Backtester(history, {"stocks": ["AAPL"], "crypto": ["BTC"]}, rebalance_every=100).run()
+    assert len(backtest["equity_curve"]) == 1000
+    assert 0 < backtest["max_drawdown"] < 1 and backtest["turnover"] > 0
+    with PriceHistory(history_path) as history:
+        aapl = history.column("AAPL")
+        btc_tail = history.column("BTC")[-10:]
+        assert aapl[1] == 100.1
+    assert history._file.closed and btc_tail[0] == 500 - 990 * 0.2
+    try:
+        aapl[0]
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected close() to release the column view")
+    sweep = run_parameter_sweep(history_path, [{"stocks": ["AAPL"]}, {"crypto": ["BTC"]}], (100, 500), workers=2)
+    assert len(sweep) == 4 and sweep[0]["total_return"] > 0 > sweep[2]["total_return"]
+    journal_path = os.path.join(tempfile.mkdtemp(), "ledger.jsonl")
+    ledger = Ledger(journal_path)
+    alice = TradingAccount("A1", "Alice", 100.0)
+    bob = TradingAccount("B1", "Bob", 50.0)
+    ledger.open_account(alice)
+    ledger.open_account(bob)
+    assert ledger.transfer("A1", "B1", 70.0)
+    assert not ledger.transfer("A1", "B1", 70.0)
+    assert ledger.post_batch([[("B1", -100.0), ("A1", 100.0)], [("B1", -50.0)]]) == [True, False]
+    try:
+        ledger.post_batch([[("A1", 1.0)], [("B1", 1.0)]], ["only one"])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected a references/batch length mismatch to be rejected")
+    alice_copy = copy.deepcopy(alice)
+    assert alice_copy.ledger is None and alice_copy.lock is not alice.lock
+    assert alice_copy.deposit(1.0) and alice_copy.balance == alice.balance + 1.0
+    crypto_copy = pickle.loads(pickle.dumps(crypto_trader))
+    assert crypto_copy.set_price_alert("ETH", 1.0, "below") and crypto_copy.lock.acquire(blocking=False)
+    assert alice.deposit(30.0) and not bob.withdraw(25.0)
+    bob.positions["AAPL"] = 1
+    ledger_engine = MatchingEngine()
+    ledger_engine.submit_order(bob, "AAPL", "sell", 1, 10.0)
+    assert ledger_engine.submit_order(alice, "AAPL", "buy", 1, 12.0)["status"] == "filled"
+    ledger.close()
+    assert Ledger.replay(journal_path) == {"A1": alice.balance, "B1": bob.balance} == {"A1": 150.0, "B1": 30.0}
 
-print("All tests passed!")
+    print("All tests passed!")
@@ -0,0 +1,194 @@
+import functools
+import json
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+# Upper bounds of the latency histogram buckets, in nanoseconds (250ns .. 1s).
+BUCKET_BOUNDS = [250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000, 250000, 500000,
+                 1000000, 2500000, 10000000, 100000000, 1000000000]
+
+_registry: Dict[str, Callable] = {}
+_installed: Dict[str, tuple] = {}
+metrics: Dict[str, "MethodMetrics"] = {}
+
+
+class MethodMetrics:
+    # Plain integer counters updated without a lock: under the GIL an
+    # occasional lost increment from racing threads is accepted in exchange
+    # for keeping the instrumented path cheap.
+    def __init__(self, name: str, sample_every: int, max_samples: int):
+        self.name = name
+        self.sample_every = sample_every
+        self.samples: deque = deque(maxlen=max_samples)
+        self.clear()
+
+    def clear(self) -> None:
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.samples.clear()
+
+    def record(self, elapsed_ns: int) -> None:
+        self.calls += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        self.buckets[bisect_left(BUCKET_BOUNDS, elapsed_ns)] += 1
+        if self.sample_every and self.calls % self.sample_every == 0:
+            self.samples.append({
+                "time": time.time(),
+                "duration_ns": elapsed_ns,
+                "thread": threading.current_thread().name,
+            })
+
+    def snapshot(self) -> Dict:
+        cumulative, running = {}, 0
+        for bound, count in zip(BUCKET_BOUNDS, self.buckets):
+            running += count
+            cumulative[str(bound / 1e9)] = running
+        cumulative["+Inf"] = self.calls
+        return {
+            "calls": self.calls,
+            "total_seconds": self.total_ns / 1e9,
+            "mean_seconds": self.total_ns / self.calls / 1e9 if self.calls else 0.0,
+            "max_seconds": self.max_ns / 1e9,
+            "buckets": cumulative,
+            "samples": list(self.samples),
+        }
+
+
+def hot_path(func: Callable) -> Callable:
+    # Only registers the function and returns it unchanged, so a disabled
+    # hot path costs nothing. enable() swaps in timing wrappers on the owning
+    # classes and disable() puts the originals back.
+    _registry[f"{func.__module__}:{func.__qualname__}"] = func
+    return func
+
+
+def _wrap(func: Callable, metric: MethodMetrics) -> Callable:
+    clock = time.perf_counter_ns
+    record = metric.record
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = clock()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            record(clock() - started)
+
+    return wrapper
+
+
+def _resolve(key: str, func: Callable):
+    module_name, qualname = key.split(":", 1)
+    owner = sys.modules.get(module_name)
+    *path, attribute = qualname.split(".")
+    for part in path:
+        owner = getattr(owner, part, None)
+    if owner is None or "<locals>" in path:
+        return None, None, None
+    return owner, attribute, owner.__dict__.get(attribute) if isinstance(owner, type) else getattr(owner, attribute, None)
+
+
+def enable(prefix: str = "", sample_every: int = 1000, max_samples: int = 256) -> List[str]:
+    installed = []
+    for key, func in _registry.items():
+        name = key.split(":", 1)[1]
+        if key in _installed or not name.startswith(prefix):
+            continue
+        owner, attribute, current = _resolve(key, func)
+        if owner is None:
+            continue
+        metric = metrics.get(name)
+        if metric is None:
+            metric = metrics[name] = MethodMetrics(name, sample_every, max_samples)
+        wrapped = _wrap(func, metric)
+        if isinstance(current, property) and current.fget is func:
+            replacement = property(wrapped, current.fset, current.fdel, current.__doc__)
+        elif isinstance(current, staticmethod) and current.__func__ is func:
+            replacement = staticmethod(wrapped)
+        elif isinstance(current, classmethod) and current.__func__ is func:
+            replacement = classmethod(wrapped)
+        elif current is func:
+            replacement = wrapped
+        else:
+            continue
+        setattr(owner, attribute, replacement)
+        _installed[key] = (owner, attribute, current)
+        installed.append(name)
+    return installed
+
+
+def disable() -> None:
+    for owner, attribute, original in _installed.values():
+        setattr(owner, attribute, original)
+    _installed.clear()
+
+
+def is_enabled() -> bool:
+    return bool(_installed)
+
+
+def reset() -> None:
+    # Installed wrappers hold on to their MethodMetrics, so those are zeroed
+    # in place; metrics of methods that are no longer installed are dropped.
+    live = {key.split(":", 1)[1] for key in _installed}
+    for name in list(metrics):
+        if name in live:
+            metrics[name].clear()
+        else:
+            del metrics[name]
+
+
+def snapshot() -> Dict[str, Dict]:
+    return {name: metric.snapshot() for name, metric in metrics.items()}
+
+
+def export_json(indent: Optional[int] = None) -> str:
+    return json.dumps(snapshot(), indent=indent)
+
+
+def export_prometheus(prefix: str = "hot_path") -> str:
+    lines = [
+        f"# HELP {prefix}_calls_total Calls to instrumented methods.",
+        f"# TYPE {prefix}_calls_total counter",
+    ]
+    data = snapshot()
+    for name, values in data.items():
+        lines.append(f'{prefix}_calls_total{{method="{name}"}} {values["calls"]}')
+    lines.append(f"# HELP {prefix}_latency_seconds Latency of instrumented methods.")
+    lines.append(f"# TYPE {prefix}_latency_seconds histogram")
+    for name, values in data.items():
+        for bound, count in values["buckets"].items():
+            lines.append(f'{prefix}_latency_seconds_bucket{{method="{name}",le="{bound}"}} {count}')
+        lines.append(f'{prefix}_latency_seconds_sum{{method="{name}"}} {values["total_seconds"]}')
+        lines.append(f'{prefix}_latency_seconds_count{{method="{name}"}} {values["calls"]}')
+    return "\n".join(lines) + "\n"
+
+
+if __name__ == "__main__":
+    # The models register against the importable module, not this __main__ copy.
+    import Instrumentation
+    from E_Commerce_Product import Product
+
+    product = Product("Gaming Laptop", 1299.00, 15.5, 25, "Electronics")
+    assert "Product.final_price" in Instrumentation.enable(sample_every=2)
+    assert abs(product.final_price - 1097.66) < 0.01
+    product.product_summary()
+    Instrumentation.disable()
+    product.final_price
+    stats = Instrumentation.snapshot()["Product.final_price"]
+    assert stats["calls"] == 2 and len(stats["samples"]) == 1
+    assert 'hot_path_calls_total{method="Product.final_price"} 2' in Instrumentation.export_prometheus()
+    Instrumentation.enable()
+    Instrumentation.reset()
+    product.final_price
+    assert Instrumentation.snapshot()["Product.final_price"]["calls"] == 1
+    Instrumentation.disable()
+    print(Instrumentation.export_json(indent=2))
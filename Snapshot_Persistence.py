@@ -0,0 +1,548 @@
+import gc
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from E_Commerce_Product import Product
+from Employee_Management import Employee
+from Financial_Trading_System import (CryptoTrader, NotificationSystem, ProfessionalTrader, RiskManagement,
+                                      StockTrader, TradingAccount)
+from Vehicle_fleet_Management import Car, Motorcycle, Truck, Vehicle
+
+# File layout: a fixed prefix (magic, record count, offset of the record index,
+# offset of the JSON header), the records, the index of record offsets (uint64,
+# native byte order) and finally the header. Index and header are written
+# last, so objects can be streamed out and class-level state is captured after
+# the last record.
+MAGIC = b"SNAP0001"
+PREFIX = struct.Struct("<8sQQQ")
+
+
+_decode_json = json.JSONDecoder().decode
+
+
+def _loads(text: str):
+    # Most JSON fields of a large population are empty; skip the decoder for those.
+    if text == "null":
+        return None
+    if text == "[]":
+        return []
+    if text == "{}":
+        return {}
+    return _decode_json(text)
+
+
+class RecordFormat:
+    # Packs one object as a fixed struct followed by its variable-length
+    # fields. Field kinds: "q" int, "d" float, "?" bool, "n" int or float
+    # (stored as a double, with a bitmask remembering which were ints),
+    # "s" UTF-8 string and "j" JSON value; "s" and "j" store their length in
+    # the struct and their bytes after it.
+    FIXED_CODES = {"q": "q", "d": "d", "?": "?", "n": "d", "s": "I", "j": "I"}
+
+    def __init__(self, fields: Sequence[Tuple[str, str]]):
+        self.names = [name for name, _ in fields]
+        self.kinds = [kind for _, kind in fields]
+        if len(fields) > 32:
+            raise ValueError("A record format supports at most 32 fields")
+        self.struct = struct.Struct("<I" + "".join(self.FIXED_CODES[kind] for kind in self.kinds))
+        self._variable = [(index, kind == "j") for index, kind in enumerate(self.kinds) if kind in "sj"]
+        self._numbers = [index for index, kind in enumerate(self.kinds) if kind == "n"]
+
+    def encode(self, values: Sequence) -> bytes:
+        fixed = [0]
+        payload = []
+        int_mask = 0
+        for position, (kind, value) in enumerate(zip(self.kinds, values)):
+            if kind == "s" or kind == "j":
+                data = (value if kind == "s" else json.dumps(value, separators=(",", ":"))).encode("utf-8")
+                payload.append(data)
+                fixed.append(len(data))
+            elif kind == "n":
+                if type(value) is int:
+                    int_mask |= 1 << position
+                fixed.append(float(value))
+            else:
+                fixed.append(value)
+        fixed[0] = int_mask
+        return self.struct.pack(*fixed) + b"".join(payload)
+
+    def decode(self, data, offset: int) -> List:
+        return next(self.decode_many(data, (offset,)))
+
+    def decode_many(self, data, offsets: Iterable[int]) -> Iterator[List]:
+        # The loop is shared by single lookups and bulk loads, with every
+        # lookup hoisted out of it. Rows are yielded one at a time so a bulk
+        # load never holds more than one decoded row. Indexes are shifted by
+        # one because the int bitmask stays at the front of the unpacked values
+        # until the end.
+        unpack_from = self.struct.unpack_from
+        size = self.struct.size
+        variable = [(index + 1, is_json) for index, is_json in self._variable]
+        numbers = [(1 << index, index + 1) for index in self._numbers]
+        loads = _loads
+        for offset in offsets:
+            values = list(unpack_from(data, offset))
+            position = offset + size
+            for index, is_json in variable:
+                end = position + values[index]
+                text = data[position:end].decode("utf-8")
+                values[index] = loads(text) if is_json else text
+                position = end
+            int_mask = values[0]
+            if int_mask:
+                for bit, index in numbers:
+                    if int_mask & bit:
+                        values[index] = int(values[index])
+            del values[0]
+            yield values
+
+
+class SnapshotModel:
+    # Describes how one model is written and rebuilt. build() restores trusted
+    # data straight into the instance attributes via cls.__new__, skipping the
+    # validating constructors and their side effects on class-level counters;
+    # those counters are saved and restored separately as class state.
+    name = ""
+    formats: Dict[type, RecordFormat] = {}
+
+    def class_for(self, obj) -> type:
+        for cls in type(obj).__mro__:
+            if cls in self.formats:
+                return cls
+        raise TypeError(f"Cannot snapshot {type(obj).__name__} as {self.name}")
+
+    def dump(self, obj) -> Sequence:
+        raise NotImplementedError
+
+    def build(self, cls: type, values: List):
+        raise NotImplementedError
+
+    def build_many(self, cls: type, rows: Iterable[List]) -> List:
+        # Used by Snapshot.materialize(); models override it with a loop that
+        # assigns the instance attributes directly.
+        return [self.build(cls, values) for values in rows]
+
+    def class_state(self) -> Dict:
+        return {}
+
+    def restore_class_state(self, state: Dict) -> None:
+        pass
+
+
+class ProductModel(SnapshotModel):
+    name = "product"
+    formats = {Product: RecordFormat([("name", "s"), ("base_price", "n"), ("discount_percent", "n"),
+                                      ("stock_quantity", "n"), ("category", "s")])}
+
+    def dump(self, product: Product) -> Sequence:
+        return (product.name, product.base_price, product.discount_percent, product.stock_quantity, product.category)
+
+    def build(self, cls: type, values: List) -> Product:
+        return self.build_many(cls, (values,))[0]
+
+    def build_many(self, cls: type, rows: Iterable[List]) -> List[Product]:
+        new = cls.__new__
+        products = []
+        append = products.append
+        for values in rows:
+            product = new(cls)
+            product._summary_cache = None
+            (product._name, product._base_price, product._discount_percent, product._stock_quantity,
+             product._category) = values
+            append(product)
+        return products
+
+    def class_state(self) -> Dict:
+        return {"categories": Product.categories, "max_base_price": Product.max_base_price,
+                "max_stock_quantity": Product.max_stock_quantity}
+
+    def restore_class_state(self, state: Dict) -> None:
+        Product.categories[:] = state["categories"]
+        Product.max_base_price = state["max_base_price"]
+        Product.max_stock_quantity = state["max_stock_quantity"]
+
+
+class EmployeeModel(SnapshotModel):
+    name = "employee"
+    formats = {Employee: RecordFormat([("employee_id", "s"), ("name", "s"), ("department", "s"), ("base_salary", "n"),
+                                       ("country", "s"), ("email", "s"), ("hire_date", "d"), ("active", "?"),
+                                       ("ratings", "j"), ("rating_times", "j")])}
+
+    def dump(self, employee: Employee) -> Sequence:
+        return (employee.employee_id, employee.name, employee.department, employee.base_salary, employee.country,
+                employee.email, employee.hire_date.timestamp(), employee._active, employee._performance_ratings,
+                [rated_at.timestamp() for rated_at in employee._rating_times])
+
+    def build(self, cls: type, values: List) -> Employee:
+        employee_id, name, department, base_salary, country, email, hire_date, active, ratings, rating_times = values
+        employee = cls.__new__(cls)
+        employee._set_fields(name, department, base_salary, country, email, datetime.fromtimestamp(hire_date))
+        employee.employee_id = employee_id
+        employee._replace_ratings(ratings, [datetime.fromtimestamp(rated_at) for rated_at in rating_times])
+        employee._active = active
+        return employee
+
+    def class_state(self) -> Dict:
+        return {"company_name": Employee.company_name, "total_employees": Employee.total_employees,
+                "departments": Employee.departments, "tax_rates": Employee.tax_rates,
+                "next_employee_id": Employee.next_employee_id,
+                "department_totals": Employee.department_statistics.export_totals()}
+
+    def restore_class_state(self, state: Dict) -> None:
+        # The dictionaries are updated in place because other code holds on to
+        # them. The id sequence only moves forward, and ids from blocks handed
+        # out before the restore are dropped, so no id is ever issued twice.
+        Employee.company_name = state["company_name"]
+        Employee.total_employees = state["total_employees"]
+        Employee.departments.clear()
+        Employee.departments.update(state["departments"])
+        Employee.tax_rates.clear()
+        Employee.tax_rates.update(state["tax_rates"])
+        Employee.tax_rates_version += 1
+        Employee.payroll_engine.clear()
+        Employee.next_employee_id = max(Employee.next_employee_id, state["next_employee_id"])
+        Employee.id_allocator.discard_blocks()
+        Employee.department_statistics.restore_totals(state["department_totals"])
+
+
+class AccountModel(SnapshotModel):
+    name = "account"
+    _fields = RecordFormat([("account_id", "s"), ("owner_name", "s"), ("balance", "n"), ("positions", "j"),
+                            ("pending_alerts", "j"), ("triggered_notifications", "j")])
+    formats = dict.fromkeys((TradingAccount, StockTrader, CryptoTrader, ProfessionalTrader), _fields)
+
+    def dump(self, account: TradingAccount) -> Sequence:
+        if isinstance(account, NotificationSystem):
+            pending, triggered = account.get_pending_notifications(), account.triggered_notifications
+        else:
+            pending = triggered = None
+        return (account.account_id, account.owner_name, account.balance, account.positions, pending, triggered)
+
+    def build(self, cls: type, values: List) -> TradingAccount:
+        return self.build_many(cls, (values,))[0]
+
+    def build_many(self, cls: type, rows: Iterable[List]) -> List[TradingAccount]:
+        new = cls.__new__
+        lock = threading.Lock
+        notifications = issubclass(cls, NotificationSystem)
+        accounts = []
+        append = accounts.append
+        for account_id, owner_name, balance, positions, pending, triggered in rows:
+            account = new(cls)
+            account.account_id = account_id
+            account.owner_name = owner_name
+            account.balance = balance
+            account.positions = positions
+            account.lock = lock()
+            if notifications:
+                NotificationSystem.__init__(account)
+                for alert in pending:
+                    account.set_price_alert(alert["asset"], alert["target_price"], alert["condition"])
+                account.triggered_notifications = triggered
+            append(account)
+        return accounts
+
+    def class_state(self) -> Dict:
+        return {"risk_thresholds": RiskManagement.risk_thresholds, "default_prices": ProfessionalTrader.default_prices}
+
+    def restore_class_state(self, state: Dict) -> None:
+        RiskManagement.risk_thresholds = tuple(state["risk_thresholds"])
+        ProfessionalTrader.default_prices = state["default_prices"]
+
+
+class VehicleModel(SnapshotModel):
+    # Fields are named after the vehicle attributes they are read from. They
+    # are written back straight into the slots behind those attributes, so a
+    # restored vehicle does not notify a registry it is not part of.
+    name = "vehicle"
+    _base = [("vehicle_id", "s"), ("make", "s"), ("model", "s"), ("year", "q"), ("daily_rate", "n"),
+             ("_is_available", "?"), ("mileage", "n"), ("fuel_type", "s"), ("_rental_stats", "j"),
+             ("_maintenance_logs", "j")]
+    formats = {
+        Vehicle: RecordFormat(_base),
+        Car: RecordFormat(_base + [("seating_capacity", "q"), ("transmission_type", "s"), ("has_gps", "?")]),
+        Motorcycle: RecordFormat(_base + [("engine_capacity", "n"), ("bike_type", "s")]),
+        Truck: RecordFormat(_base + [("cargo_capacity", "n"), ("is_license_required", "?"), ("max_weight", "n")]),
+    }
+    tunables = ("rental_multiplier", "gps_multiplier")
+
+    def dump(self, vehicle: Vehicle) -> Sequence:
+        return [getattr(vehicle, name) for name in self.formats[self.class_for(vehicle)].names]
+
+    def build(self, cls: type, values: List) -> Vehicle:
+        return self.build_many(cls, (values,))[0]
+
+    def build_many(self, cls: type, rows: Iterable[List]) -> List[Vehicle]:
+        new = cls.__new__
+        intern = sys.intern
+        vehicles = []
+        append = vehicles.append
+        for values in rows:
+            vehicle = new(cls)
+            vehicle._fleet = None
+            (vehicle.vehicle_id, make, model, vehicle.year, vehicle.daily_rate, vehicle._is_available,
+             vehicle.mileage, fuel_type, vehicle._rental_stats, vehicle._maintenance_logs) = values[:10]
+            vehicle.make = intern(make)
+            vehicle.model = intern(model)
+            vehicle._fuel_type = intern(fuel_type)
+            if cls is Car:
+                vehicle._seating_capacity, transmission_type, vehicle._has_gps = values[10:]
+                vehicle.transmission_type = intern(transmission_type)
+            elif cls is Motorcycle:
+                vehicle.engine_capacity, bike_type = values[10:]
+                vehicle.bike_type = intern(bike_type)
+            elif cls is Truck:
+                vehicle._cargo_capacity, vehicle.is_license_required, vehicle.max_weight = values[10:]
+            append(vehicle)
+        return vehicles
+
+    def class_state(self) -> Dict:
+        return {cls.__name__: {name: cls.__dict__[name] for name in self.tunables if name in cls.__dict__}
+                for cls in self.formats}
+
+    def restore_class_state(self, state: Dict) -> None:
+        for cls in self.formats:
+            for name, value in state.get(cls.__name__, {}).items():
+                setattr(cls, name, value)
+
+
+MODELS: Dict[str, SnapshotModel] = {model.name: model for model in
+                                    (ProductModel(), EmployeeModel(), AccountModel(), VehicleModel())}
+
+
+def save_snapshot(path: str, model: str, objects: Iterable) -> int:
+    snapshot_model = MODELS[model]
+    class_codes: Dict[type, int] = {}
+    offsets = array("Q")
+    with open(path, "wb") as handle:
+        handle.write(PREFIX.pack(MAGIC, 0, 0, 0))
+        position = PREFIX.size
+        for obj in objects:
+            cls = snapshot_model.class_for(obj)
+            code = class_codes.get(cls)
+            if code is None:
+                code = class_codes[cls] = len(class_codes)
+            record = bytes((code,)) + snapshot_model.formats[cls].encode(snapshot_model.dump(obj))
+            handle.write(record)
+            offsets.append(position)
+            position += len(record)
+        padding = -position % 8
+        handle.write(b"\0" * padding)
+        index_offset = position + padding
+        offsets.tofile(handle)
+        header = {
+            "model": model,
+            "classes": [cls.__name__ for cls in class_codes],
+            "class_state": snapshot_model.class_state(),
+            "created": datetime.now().isoformat(timespec="seconds"),
+        }
+        handle.write(json.dumps(header).encode("utf-8"))
+        handle.seek(0)
+        handle.write(PREFIX.pack(MAGIC, len(offsets), index_offset, index_offset + len(offsets) * offsets.itemsize))
+    return len(offsets)
+
+
+class Snapshot:
+    # Read side of a snapshot file. The file is memory-mapped and objects are
+    # only rebuilt when first accessed, then cached, so opening a snapshot of
+    # millions of objects costs the header parse plus whatever is touched.
+    # Class-level state is restored on open unless restore_state is False.
+    def __init__(self, path: str, restore_state: bool = True):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, index_offset, header_offset = PREFIX.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError("Not a snapshot file")
+        header = json.loads(self._map[header_offset:].decode("utf-8"))
+        self.model = MODELS[header["model"]]
+        self.created: str = header["created"]
+        self.class_state: Dict = header["class_state"]
+        by_name = {cls.__name__: cls for cls in self.model.formats}
+        self._classes = [by_name[name] for name in header["classes"]]
+        self._formats = [self.model.formats[cls] for cls in self._classes]
+        self._offsets = memoryview(self._map)[index_offset:index_offset + count * 8].cast("Q")
+        self._objects: List = [None] * count
+        if restore_state:
+            self.model.restore_class_state(self.class_state)
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def __getitem__(self, index: int):
+        obj = self._objects[index]
+        if obj is None:
+            if index < 0:
+                index += len(self._objects)
+            offset = self._offsets[index]
+            code = self._map[offset]
+            obj = self._objects[index] = self.model.build(self._classes[code],
+                                                          self._formats[code].decode(self._map, offset + 1))
+        return obj
+
+    def __iter__(self):
+        for index in range(len(self._objects)):
+            yield self[index]
+
+    def materialize(self) -> List:
+        # Bulk path: the records not loaded yet are grouped by class, decoded
+        # in one pass per class and built with the model's build_many(). The
+        # cyclic garbage collector is paused meanwhile; it would otherwise
+        # rescan the growing population over and over while nothing is freed.
+        objects = self._objects
+        data = self._map
+        offsets = self._offsets.tolist()
+        missing = [index for index, obj in enumerate(objects) if obj is None]
+        codes = [data[offsets[index]] for index in missing]
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for code, cls in enumerate(self._classes):
+                indexes = [index for index, record_code in zip(missing, codes) if record_code == code]
+                rows = self._formats[code].decode_many(data, [offsets[index] + 1 for index in indexes])
+                for index, obj in zip(indexes, self.model.build_many(cls, rows)):
+                    objects[index] = obj
+        finally:
+            if gc_enabled:
+                gc.enable()
+        return list(objects)
+
+    def loaded_count(self) -> int:
+        return sum(obj is not None for obj in self._objects)
+
+    def close(self) -> None:
+        # Objects already rebuilt stay valid; they hold no references to the map.
+        self._objects = []
+        if getattr(self, "_offsets", None) is not None:
+            self._offsets.release()
+            self._offsets = None
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def open_snapshot(path: str, restore_state: bool = True) -> Snapshot:
+    return Snapshot(path, restore_state)
+
+
+def benchmark_warm_start(n: int, directory: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+    # Compares rebuilding n objects through the constructors with opening a
+    # snapshot of them, touching one object, and rebuilding all of them.
+    from Benchmark_Suite import make_accounts, make_employees, make_products, make_vehicles
+
+    factories: Dict[str, Callable[[int], List]] = {
+        "product": make_products, "employee": make_employees, "account": make_accounts, "vehicle": make_vehicles,
+    }
+    results = {}
+    with tempfile.TemporaryDirectory(dir=directory) as workdir:
+        for model, factory in factories.items():
+            gc.collect()
+            started = time.perf_counter()
+            objects = factory(n)
+            constructed = time.perf_counter() - started
+            path = os.path.join(workdir, f"{model}.snap")
+            started = time.perf_counter()
+            save_snapshot(path, model, objects)
+            saved = time.perf_counter() - started
+            del objects
+            gc.collect()
+            started = time.perf_counter()
+            with open_snapshot(path) as snapshot:
+                snapshot[len(snapshot) // 2]
+                first_access = time.perf_counter() - started
+                snapshot.materialize()
+                materialized = time.perf_counter() - started
+            results[model] = {
+                "constructors": constructed,
+                "save": saved,
+                "open_and_first_access": first_access,
+                "full_materialize": materialized,
+                "bytes_per_object": os.path.getsize(path) / n,
+            }
+    return results
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as workdir:
+        products = [Product("Gaming Laptop", 1299.00, 15.5, 25, "Electronics"),
+                    Product("Running Shoes", 120, 10, 0, "Sports")]
+        path = os.path.join(workdir, "products.snap")
+        assert save_snapshot(path, "product", products) == 2
+        with open_snapshot(path) as snapshot:
+            assert len(snapshot) == 2 and snapshot.loaded_count() == 0
+            shoes = snapshot[1]
+            assert snapshot.loaded_count() == 1 and snapshot[-1] is shoes
+            assert shoes.base_price == 120 and type(shoes.base_price) is int
+            assert shoes.product_summary() == products[1].product_summary()
+            assert snapshot[0].final_price == products[0].final_price
+            assert snapshot.materialize()[1] is shoes and snapshot.loaded_count() == 2
+
+        employee = Employee.from_csv_data("Sarah Johnson,HR,45000,India,sarah.johnson@example.com")
+        employee.add_performance_rating(4)
+        employee.add_performance_rating(5)
+        departments = dict(Employee.departments)
+        total_employees = Employee.total_employees
+        next_employee_id = Employee.next_employee_id
+        department_stats = Employee.get_department_stats()["HR"]
+        path = os.path.join(workdir, "employees.snap")
+        save_snapshot(path, "employee", [employee])
+        Employee.departments["HR"] = 0
+        Employee.total_employees = 0
+        Employee.department_statistics.restore_totals({})
+        with open_snapshot(path) as snapshot:
+            assert Employee.departments == departments and Employee.total_employees == total_employees
+            assert Employee.next_employee_id >= next_employee_id
+            assert Employee.get_department_stats()["HR"] == department_stats
+            restored = snapshot[0]
+        assert restored.employee_id == employee.employee_id and restored.hire_date == employee.hire_date
+        assert restored.get_average_performance() == 4.5 and restored.calculate_net_salary() == employee.calculate_net_salary()
+        restored.terminate()
+        assert Employee.departments["HR"] == departments["HR"] - 1
+        assert Employee.get_department_stats()["HR"]["count"] == department_stats["count"] - 1
+
+        trader = ProfessionalTrader("PT001", "Alex Johnson", 100000.0)
+        trader.positions["AAPL"] = 10
+        trader.set_price_alert("BTC", 60000, "above")
+        path = os.path.join(workdir, "accounts.snap")
+        save_snapshot(path, "account", [trader, TradingAccount("TA001", "Sam Lee", 500)])
+        with open_snapshot(path) as snapshot:
+            restored, plain = snapshot.materialize()
+        assert type(restored) is ProfessionalTrader and restored.positions == {"AAPL": 10}
+        assert restored.withdraw(1000) and restored.balance == 99000.0
+        assert restored.on_price_tick("BTC", 61000)[0]["triggered_price"] == 61000
+        assert type(plain) is TradingAccount and plain.balance == 500
+
+        car = Car("CAR001", "Toyota", "Camry", 2023, 45.0, True, 12000, "Petrol", 5, "Automatic", True)
+        car.add_maintenance("Oil change")
+        car.rent()
+        truck = Truck("TRUCK001", "Ford", "F-150", 2023, 85.0, True, 15000, "Diesel", 5000, True, 8000)
+        path = os.path.join(workdir, "vehicles.snap")
+        save_snapshot(path, "vehicle", [car, truck])
+        with open_snapshot(path) as snapshot:
+            restored_car, restored_truck = snapshot
+        assert restored_car.get_vehicle_info() == car.get_vehicle_info()
+        assert restored_car.get_maintenance_history() == car.get_maintenance_history()
+        assert restored_car.return_vehicle() and restored_car.rental_usage()[1] == 1
+        assert restored_truck.calculate_rental_cost(3) == truck.calculate_rental_cost(3)
+        assert restored_truck.make is truck.make
+
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for model, timings in benchmark_warm_start(size).items():
+        print(f"{model:10s} constructors {timings['constructors']:8.3f}s  save {timings['save']:8.3f}s  "
+              f"open+first {timings['open_and_first_access'] * 1000:8.2f}ms  "
+              f"materialize {timings['full_materialize']:8.3f}s  {timings['bytes_per_object']:6.1f} B/object")
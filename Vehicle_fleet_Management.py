@@ -1,44 +1,264 @@
 # from datetime import datetime
-from datetime import datetime
+from datetime import date
+from bisect import bisect_left, bisect_right, insort
+from array import array
+import mmap
+import os
+import struct
+import sys
+import time
+import tracemalloc
+
+from Instrumentation import hot_path
+
+class MaintenanceLogStore:
+    # Append-only maintenance log on disk. After an 8-byte magic header each
+    # record is: vehicle id length (u16), day as a date ordinal (i32),
+    # description length (u16), then the UTF-8 id and description. Reads go
+    # through an mmap; the per-vehicle index of record offsets and days is
+    # rebuilt by one sequential scan when the store is opened.
+    MAGIC=b"MLOG0001"
+    RECORD=struct.Struct("<HiH")
+
+    def __init__(self,path):
+        self.path=path
+        if not os.path.exists(path) or os.path.getsize(path)==0:
+            with open(path,"wb") as handle:
+                handle.write(self.MAGIC)
+        self._file=open(path,"r+b")
+        self._map=None
+        self._mapped_size=0
+        self._offsets={}
+        self._days={}
+        self._unsorted=set()
+        self._scan()
+        self._file.seek(0,os.SEEK_END)
+
+    def _remap(self):
+        # A superseded map is not closed here: iterators from iter_history may
+        # still be reading it, and it is released once they drop it.
+        size=os.fstat(self._file.fileno()).st_size
+        if size!=self._mapped_size:
+            self._map=mmap.mmap(self._file.fileno(),size,access=mmap.ACCESS_READ)
+            self._mapped_size=size
+        return self._map
+
+    def _scan(self):
+        data=self._remap()
+        if data[:8]!=self.MAGIC:
+            raise ValueError("Not a maintenance log file")
+        offset=8
+        size=len(data)
+        header=self.RECORD.size
+        while offset+header<=size:
+            id_length,day,text_length=self.RECORD.unpack_from(data,offset)
+            end=offset+header+id_length+text_length
+            if end>size:
+                break
+            vehicle_id=data[offset+header:offset+header+id_length].decode("utf-8")
+            self._index(vehicle_id,offset,day)
+            offset=end
+        if offset<size:
+            # Drop a torn record left behind by a crash mid-append.
+            self._map.close()
+            self._map=None
+            self._mapped_size=0
+            self._file.truncate(offset)
+
+    def _index(self,vehicle_id,offset,day):
+        offsets=self._offsets.get(vehicle_id)
+        if offsets is None:
+            offsets=self._offsets[vehicle_id]=array("q")
+            self._days[vehicle_id]=array("i")
+        days=self._days[vehicle_id]
+        if days and day<days[-1]:
+            self._unsorted.add(vehicle_id)
+        offsets.append(offset)
+        days.append(day)
+
+    def append(self,vehicle_id,description,day=None):
+        day=day or date.today()
+        ordinal=day.toordinal()
+        encoded_id=vehicle_id.encode("utf-8")
+        text=description.encode("utf-8")
+        if len(encoded_id)>0xFFFF or len(text)>0xFFFF:
+            raise ValueError("Vehicle id and description must be under 64 KiB")
+        offset=self._file.tell()
+        self._file.write(self.RECORD.pack(len(encoded_id),ordinal,len(text))+encoded_id+text)
+        self._file.flush()
+        self._index(vehicle_id,offset,ordinal)
+
+    def count(self,vehicle_id):
+        offsets=self._offsets.get(vehicle_id)
+        return len(offsets) if offsets else 0
+
+    def iter_history(self,vehicle_id,start=None,end=None):
+        offsets=self._offsets.get(vehicle_id)
+        if not offsets:
+            return
+        days=self._days[vehicle_id]
+        low=start.toordinal() if start else None
+        high=end.toordinal() if end else None
+        if vehicle_id in self._unsorted:
+            positions=[i for i,d in enumerate(days) if (low is None or d>=low) and (high is None or d<=high)]
+        else:
+            first=bisect_left(days,low) if low is not None else 0
+            last=bisect_right(days,high) if high is not None else len(days)
+            positions=range(first,last)
+        data=self._remap()
+        header=self.RECORD.size
+        for i in positions:
+            offset=offsets[i]
+            id_length,day,text_length=self.RECORD.unpack_from(data,offset)
+            text_start=offset+header+id_length
+            yield {
+                "date":date.fromordinal(day).isoformat(),
+                "description":data[text_start:text_start+text_length].decode("utf-8"),
+            }
+
+    def history(self,vehicle_id,start=None,end=None):
+        return list(self.iter_history(vehicle_id,start,end))
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map=None
+        self._file.close()
+
+
+_today_cache=[0,""]
+
+def _today_string():
+    today=date.today()
+    if today.toordinal()!=_today_cache[0]:
+        _today_cache[0]=today.toordinal()
+        _today_cache[1]=today.strftime("%Y-%m-%d")
+    return _today_cache[1]
+
 
 class MaintenanceRecord:
+    # Slotted, and the log list is only allocated on first use, since most
+    # vehicles in a large fleet have no maintenance entries in memory. When a
+    # MaintenanceLogStore is attached as maintenance_store, entries go there
+    # (keyed by vehicle_id) instead of into the in-object list.
+    __slots__=("_maintenance_logs",)
+    maintenance_store=None
+
     def __init__(self):  # Fixed: was _init__ (missing underscore)
-        self.maintenance_logs=[]
+        self._maintenance_logs=None
+
+    @property
+    def maintenance_logs(self):
+        if self._maintenance_logs is None:
+            self._maintenance_logs=[]
+        return self._maintenance_logs
 
     def add_maintenance(self,description):
+        if self.maintenance_store is not None:
+            self.maintenance_store.append(self.vehicle_id,description)
+            return
         self.maintenance_logs.append({
-            "date":datetime.now().strftime("%Y-%m-%d"),
+            "date":_today_string(),
             "description":description
         })
 
     def get_maintenance_history(self):
+        if self.maintenance_store is not None:
+            return self.maintenance_store.history(self.vehicle_id)
         return self.maintenance_logs
 
+    def iter_maintenance_history(self,start=None,end=None):
+        if self.maintenance_store is not None:
+            return self.maintenance_store.iter_history(self.vehicle_id,start,end)
+        return (entry for entry in self.maintenance_logs
+                if (start is None or entry["date"]>=start.isoformat()) and (end is None or entry["date"]<=end.isoformat()))
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+def _indexed_attribute(slot,intern=False):
+    # Attribute backed by `slot` that tells the vehicle's FleetRegistry when it
+    # changes, so the registry's search indexes stay current.
+    def getter(self):
+        return getattr(self,slot)
+
+    def setter(self,value):
+        setattr(self,slot,_intern(value) if intern else value)
+        if self._fleet is not None:
+            self._fleet._attributes_changed(self)
+
+    return property(getter,setter)
+
+
 class Vehicle(MaintenanceRecord):
+    __slots__=("vehicle_id","make","model","year","daily_rate","_is_available","mileage","_fuel_type","_fleet","_rental_stats")
+    rental_multiplier=1.0
+
     def __init__(self,vehicle_id,make,model,year,daily_rate,is_available,mileage,fuel_type):
         super().__init__()
+        self._fleet=None
+        self._rental_stats=None
         self.vehicle_id=vehicle_id
-        self.make=make
-        self.model=model
+        self.make=_intern(make)
+        self.model=_intern(model)
         self.year=year
         self.daily_rate=daily_rate
         self.is_available=is_available
         self.mileage=mileage
         self.fuel_type=fuel_type
+
+    fuel_type=_indexed_attribute("_fuel_type",intern=True)
+
+    @property
+    def fleet(self):
+        return self._fleet
+
+    @property
+    def is_available(self):
+        return self._is_available
+
+    @is_available.setter
+    def is_available(self,value):
+        self._is_available=value
+        if self._fleet is not None:
+            self._fleet._availability_changed(self)
         
+    @hot_path
     def rent(self):
         if not self.is_available:
             return "Vehicle is not available for rent"
         self.is_available=False
+        # [rented_at or None, total rented seconds, completed rentals], created on first rental
+        if self._rental_stats is None:
+            self._rental_stats=[None,0.0,0]
+        self._rental_stats[0]=time.time()
         return f"Vehicle {self.vehicle_id} rented successfully"
     
+    @hot_path
     def return_vehicle(self):
         self.is_available=True
+        stats=self._rental_stats
+        if stats is not None and stats[0] is not None:
+            stats[1]+=time.time()-stats[0]
+            stats[2]+=1
+            stats[0]=None
         return f"Vehicle {self.vehicle_id} returned successfully"
+
+    def rental_usage(self,now=None):
+        stats=self._rental_stats
+        if stats is None:
+            return 0.0,0
+        seconds=stats[1]
+        if stats[0] is not None:
+            seconds+=(now or time.time())-stats[0]
+        return seconds,stats[2]
     
+    @hot_path
     def calculate_rental_cost(self,days):
         return self.daily_rate * days
     
+    @hot_path
     def get_vehicle_info(self):
         return f"Vehicle ID: {self.vehicle_id}, Make: {self.make}, Model: {self.model}, Year: {self.year}, Daily Rate: ${self.daily_rate}, Available: {'Yes' if self.is_available else 'No'}, Mileage: {self.mileage} miles, Fuel Type: {self.fuel_type}"
     
@@ -47,57 +267,395 @@ class Vehicle(MaintenanceRecord):
     
 
 class Car(Vehicle):
+    __slots__=("_seating_capacity","transmission_type","_has_gps")
+    gps_multiplier=1.2
+
     def __init__(self,vehicle_id,make,model,year,daily_rate,is_available,mileage,fuel_type,seating_capacity,transmission_type,has_gps):
         super().__init__(vehicle_id,make,model,year,daily_rate,is_available,mileage,fuel_type)
         self.seating_capacity=seating_capacity
-        self.transmission_type=transmission_type
+        self.transmission_type=_intern(transmission_type)
         self.has_gps=has_gps 
+
+    seating_capacity=_indexed_attribute("_seating_capacity")
+    has_gps=_indexed_attribute("_has_gps")
         
+    @hot_path
     def get_vehicle_info(self):  # Fixed: removed duplicate method
         base_info=super().get_vehicle_info()
         return f"{base_info}, Seating Capacity: {self.seating_capacity}, Transmission: {self.transmission_type}, GPS: {'Yes' if self.has_gps else 'No'}"
 
+    @hot_path
     def calculate_rental_cost(self, days):
-        multiplier=1.2 if self.has_gps else 1.0
+        multiplier=self.gps_multiplier if self.has_gps else 1.0
         return self.daily_rate * days * multiplier
     
     def calculate_fuel_efficiency(self):
         return {"city_mpg":20,"highway_mpg":30}
     
 class Motorcycle(Vehicle):
+    __slots__=("engine_capacity","bike_type")
+    rental_multiplier=0.8
+
     def __init__(self,vehicle_id,make,model,year,daily_rate,is_available,mileage,fuel_type,engine_capacity,bike_type):
         super().__init__(vehicle_id,make,model,year,daily_rate,is_available,mileage,fuel_type)
         self.engine_capacity=engine_capacity
-        self.bike_type=bike_type 
+        self.bike_type=_intern(bike_type)
         
+    @hot_path
     def get_vehicle_info(self):  # Fixed: removed duplicate method
         base_info=super().get_vehicle_info()
         return f"{base_info}, Engine Capacity: {self.engine_capacity} cc, Bike Type: {self.bike_type}"
     
+    @hot_path
     def calculate_rental_cost(self,days):
-        return self.daily_rate * days * 0.8
+        return self.daily_rate * days * self.rental_multiplier
     
     def calculate_fuel_efficiency(self):
         return 60
     
 class Truck(Vehicle):
+    __slots__=("_cargo_capacity","is_license_required","max_weight")
+    rental_multiplier=1.5
+
     def __init__(self,vehicle_id,make,model,year,daily_rate,is_available,mileage,fuel_type,cargo_capacity,is_cdl_required,max_weight):  # Fixed: added missing parameters and removed engine_capacity
         super().__init__(vehicle_id,make,model,year,daily_rate,is_available,mileage,fuel_type)
         self.cargo_capacity=cargo_capacity
         self.is_license_required=is_cdl_required
         self.max_weight=max_weight  # Fixed: now properly defined as parameter
+
+    cargo_capacity=_indexed_attribute("_cargo_capacity")
         
+    @hot_path
     def calculate_rental_cost(self,days):
-        return self.daily_rate * days * 1.5
+        return self.daily_rate * days * self.rental_multiplier
     
     def calculate_fuel_efficiency(self):
         return {"empty_mpg":15,"loaded_mpg":12}
     
+    @hot_path
     def get_vehicle_info(self):
         base_info=super().get_vehicle_info()
         return f"{base_info}, Cargo Capacity: {self.cargo_capacity} lbs, License Required: {'Yes' if self.is_license_required else 'No'}, Max Weight: {self.max_weight} lbs"
     
 
+class ReservationCalendar:
+    # Bookings of one vehicle never overlap, so keeping them as half-open
+    # [start, end) intervals sorted by start is enough: only the neighbours of
+    # the bisect position can conflict, which makes checks O(log n).
+    def __init__(self):
+        self.starts=[]
+        self.ends=[]
+        self.references=[]
+
+    def is_free(self,start,end):
+        i=bisect_right(self.starts,start)
+        if i>0 and self.ends[i-1]>start:
+            return False
+        return i==len(self.starts) or self.starts[i]>=end
+
+    def book(self,start,end,reference=None):
+        if end<=start:
+            raise ValueError("Reservation must end after it starts")
+        if not self.is_free(start,end):
+            return False
+        i=bisect_right(self.starts,start)
+        self.starts.insert(i,start)
+        self.ends.insert(i,end)
+        self.references.insert(i,reference)
+        return True
+
+    def cancel(self,start):
+        i=bisect_left(self.starts,start)
+        if i==len(self.starts) or self.starts[i]!=start:
+            return False
+        del self.starts[i],self.ends[i],self.references[i]
+        return True
+
+    def __len__(self):
+        return len(self.starts)
+
+
+class FleetRegistry:
+    # Indexes vehicles by type, fuel type, GPS, seating and cargo capacity and
+    # current availability, plus one ReservationCalendar per vehicle. Queries
+    # start from the smallest matching index instead of scanning the fleet.
+    def __init__(self,vehicles=()):
+        self.vehicles={}
+        self.calendars={}
+        self.by_type={}
+        self.by_fuel_type={}
+        self.with_gps=set()
+        self.available=set()
+        self.seating=[]
+        self.cargo=[]
+        self.indexed_values={}
+        for vehicle in vehicles:
+            self.register(vehicle)
+
+    def register(self,vehicle):
+        vehicle_id=vehicle.vehicle_id
+        if vehicle_id in self.vehicles:
+            raise ValueError(f"Vehicle {vehicle_id} is already registered")
+        if vehicle._fleet is not None:
+            raise ValueError(f"Vehicle {vehicle_id} belongs to another fleet")
+        self.vehicles[vehicle_id]=vehicle
+        self.calendars[vehicle_id]=ReservationCalendar()
+        self.by_type.setdefault(type(vehicle).__name__,set()).add(vehicle_id)
+        self._index(vehicle)
+        if vehicle.is_available:
+            self.available.add(vehicle_id)
+        vehicle._fleet=self
+
+    def unregister(self,vehicle_id):
+        vehicle=self.vehicles.pop(vehicle_id)
+        del self.calendars[vehicle_id]
+        self.by_type[type(vehicle).__name__].discard(vehicle_id)
+        self._unindex(vehicle_id)
+        self.available.discard(vehicle_id)
+        vehicle._fleet=None
+        return vehicle
+
+    def _index(self,vehicle):
+        # The indexed values are kept per vehicle, so entries are always removed
+        # by the values they were added with.
+        vehicle_id=vehicle.vehicle_id
+        values=(vehicle.fuel_type,bool(getattr(vehicle,"has_gps",False)),
+                getattr(vehicle,"seating_capacity",None),getattr(vehicle,"cargo_capacity",None))
+        self.indexed_values[vehicle_id]=values
+        fuel_type,has_gps,seating,cargo=values
+        self.by_fuel_type.setdefault(fuel_type,set()).add(vehicle_id)
+        if has_gps:
+            self.with_gps.add(vehicle_id)
+        if seating is not None:
+            insort(self.seating,(seating,vehicle_id))
+        if cargo is not None:
+            insort(self.cargo,(cargo,vehicle_id))
+
+    def _unindex(self,vehicle_id):
+        fuel_type,has_gps,seating,cargo=self.indexed_values.pop(vehicle_id)
+        self.by_fuel_type[fuel_type].discard(vehicle_id)
+        self.with_gps.discard(vehicle_id)
+        for index,value in ((self.seating,seating),(self.cargo,cargo)):
+            if value is not None:
+                del index[bisect_left(index,(value,vehicle_id))]
+
+    def _attributes_changed(self,vehicle):
+        self._unindex(vehicle.vehicle_id)
+        self._index(vehicle)
+
+    def _availability_changed(self,vehicle):
+        if vehicle.is_available:
+            self.available.add(vehicle.vehicle_id)
+        else:
+            self.available.discard(vehicle.vehicle_id)
+
+    @staticmethod
+    def _at_least(index,minimum):
+        return {vehicle_id for _,vehicle_id in index[bisect_left(index,(minimum,"")):]}
+
+    def find_available(self,vehicle_type=None,fuel_type=None,has_gps=None,min_seating=None,min_cargo=None,start=None,end=None):
+        if (start is None)!=(end is None):
+            raise ValueError("start and end must be given together")
+        candidates=[]
+        if vehicle_type is not None:
+            candidates.append(self.by_type.get(vehicle_type,set()))
+        if fuel_type is not None:
+            candidates.append(self.by_fuel_type.get(fuel_type,set()))
+        if has_gps:
+            candidates.append(self.with_gps)
+        if min_seating is not None:
+            candidates.append(self._at_least(self.seating,min_seating))
+        if min_cargo is not None:
+            candidates.append(self._at_least(self.cargo,min_cargo))
+        # A vehicle that is out right now can still be booked for a future window.
+        if start is None or start<=date.today():
+            candidates.append(self.available)
+        if not candidates:
+            candidates.append(self.vehicles.keys())
+        candidates.sort(key=len)
+        rest=candidates[1:]
+        matches=[]
+        for vehicle_id in candidates[0]:
+            if not all(vehicle_id in c for c in rest):
+                continue
+            if has_gps is False and vehicle_id in self.with_gps:
+                continue
+            if start is not None and not self.calendars[vehicle_id].is_free(start,end):
+                continue
+            matches.append(self.vehicles[vehicle_id])
+        return sorted(matches,key=lambda vehicle:vehicle.vehicle_id)
+
+    def reserve(self,vehicle_id,start,end,reference=None):
+        return self.calendars[vehicle_id].book(start,end,reference)
+
+    def cancel_reservation(self,vehicle_id,start):
+        return self.calendars[vehicle_id].cancel(start)
+
+
+class LongRentalDiscount:
+    def __init__(self,min_days,discount,vehicle_types=None):
+        self.min_days=min_days
+        self.discount=discount
+        self.vehicle_types=vehicle_types
+
+    def factor(self,days,start):
+        return 1-self.discount if days>=self.min_days else 1.0
+
+
+class SeasonalRate:
+    def __init__(self,months,factor,vehicle_types=None):
+        self.months=set(months)
+        self.rate_factor=factor
+        self.vehicle_types=vehicle_types
+
+    def factor(self,days,start):
+        return self.rate_factor if start is not None and start.month in self.months else 1.0
+
+
+class PricingEngine:
+    # The per-class calculate_rental_cost rules reduce to one multiplier per
+    # (class, has_gps) pair. Those are compiled into a table once, and extra
+    # rules are evaluated once per (class, duration) instead of per vehicle.
+    def __init__(self,rules=()):
+        self.rules=list(rules)
+        self._multipliers={}
+
+    def add_rule(self,rule):
+        self.rules.append(rule)
+
+    def multiplier(self,vehicle):
+        key=(type(vehicle),bool(getattr(vehicle,"has_gps",False)))
+        multiplier=self._multipliers.get(key)
+        if multiplier is None:
+            vehicle_class,has_gps=key
+            multiplier=vehicle_class.rental_multiplier*(getattr(vehicle_class,"gps_multiplier",1.0) if has_gps else 1.0)
+            self._multipliers[key]=multiplier
+        return multiplier
+
+    def _duration_factors(self,vehicle_class,durations,start):
+        factors=[1.0]*len(durations)
+        for rule in self.rules:
+            if rule.vehicle_types is None or issubclass(vehicle_class,rule.vehicle_types):
+                factors=[f*rule.factor(days,start) for f,days in zip(factors,durations)]
+        return factors
+
+    def quote(self,vehicles,durations,start=None):
+        # Returns one array of costs per vehicle, one column per duration.
+        durations=list(durations)
+        factors_by_class={}
+        quotes=[]
+        for vehicle in vehicles:
+            vehicle_class=type(vehicle)
+            factors=factors_by_class.get(vehicle_class)
+            if factors is None:
+                factors=factors_by_class[vehicle_class]=self._duration_factors(vehicle_class,durations,start)
+            rate=vehicle.daily_rate
+            multiplier=self.multiplier(vehicle)
+            quotes.append(array("d",[rate*days*multiplier*factor for days,factor in zip(durations,factors)]))
+        return quotes
+
+    def cheapest(self,vehicles,days,start=None):
+        vehicles=list(vehicles)
+        costs=[row[0] for row in self.quote(vehicles,[days],start)]
+        return sorted(zip(costs,[vehicle.vehicle_id for vehicle in vehicles]))
+
+
+def measure_memory_per_vehicle(count=100000):
+    # Average traced allocation per Car, including its id string.
+    tracemalloc.start()
+    try:
+        before=tracemalloc.get_traced_memory()[0]
+        fleet=[Car(f"CAR{i:07d}","Toyota","Camry",2023,45.0,True,12000,"Petrol",5,"Automatic",True) for i in range(count)]
+        after=tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return {"vehicles":len(fleet),"bytes_per_vehicle":(after-before)/count}
+
+
+def normalized_mpg(efficiency):
+    # calculate_fuel_efficiency returns a scalar (Motorcycle), city/highway
+    # figures (Car, combined with the EPA 55/45 weighting) or empty/loaded
+    # figures (Truck, equal weighting). Combine them as a harmonic mean.
+    if isinstance(efficiency,(int,float)):
+        return float(efficiency)
+    if "city_mpg" in efficiency and "highway_mpg" in efficiency:
+        return 1/(0.55/efficiency["city_mpg"]+0.45/efficiency["highway_mpg"])
+    values=list(efficiency.values())
+    return len(values)/sum(1/value for value in values)
+
+
+class FleetAnalytics:
+    # Builds one metrics row per vehicle and aggregates rows by fuel type, make
+    # or class. The normalized mpg is computed once per class; the rest of a
+    # row is a few lookups and is rebuilt on every call. Utilization is rented
+    # time over the time since `since`.
+    fuel_prices={"Petrol":3.6,"Diesel":4.1,"Hybrid":3.6,"Electric":1.2}
+
+    def __init__(self,fuel_prices=None,since=None):
+        if fuel_prices is not None:
+            self.fuel_prices=fuel_prices
+        self.since=since if since is not None else time.time()
+        self._mpg_by_class={}
+
+    def _mpg(self,vehicle):
+        vehicle_class=type(vehicle)
+        mpg=self._mpg_by_class.get(vehicle_class)
+        if mpg is None:
+            mpg=self._mpg_by_class[vehicle_class]=normalized_mpg(vehicle.calculate_fuel_efficiency())
+        return mpg
+
+    def _row(self,vehicle):
+        fuel_type=vehicle.fuel_type
+        price=self.fuel_prices.get(fuel_type,0.0)
+        mpg=self._mpg(vehicle)
+        mileage=vehicle.mileage
+        return (type(vehicle).__name__,vehicle.make,fuel_type,mpg,mileage,mileage/mpg*price,price/mpg)
+
+    def metrics_table(self,vehicles,now=None):
+        now=now or time.time()
+        window=max(now-self.since,1e-9)
+        vehicles=list(vehicles)
+        rows=[self._row(vehicle) for vehicle in vehicles]
+        usage=[vehicle.rental_usage(now) for vehicle in vehicles]
+        columns=list(zip(*rows)) if rows else [()]*7
+        return {
+            "vehicle_id":[vehicle.vehicle_id for vehicle in vehicles],
+            "vehicle_class":list(columns[0]),
+            "make":list(columns[1]),
+            "fuel_type":list(columns[2]),
+            "mpg":array("d",columns[3]),
+            "mileage":array("d",columns[4]),
+            "fuel_cost":array("d",columns[5]),
+            "cost_per_mile":array("d",columns[6]),
+            "utilization":array("d",[min(seconds/window,1.0) for seconds,_ in usage]),
+            "rentals":array("l",[count for _,count in usage]),
+        }
+
+    def report(self,vehicles,by="fuel_type",now=None):
+        table=self.metrics_table(vehicles,now)
+        groups={}
+        for key,mileage,fuel_cost,utilization,rentals in zip(table[by],table["mileage"],table["fuel_cost"],table["utilization"],table["rentals"]):
+            group=groups.get(key)
+            if group is None:
+                group=groups[key]=[0,0.0,0.0,0.0,0]
+            group[0]+=1
+            group[1]+=mileage
+            group[2]+=fuel_cost
+            group[3]+=utilization
+            group[4]+=rentals
+        return {
+            key:{
+                "vehicles":count,
+                "mileage":mileage,
+                "fuel_cost":round(fuel_cost,2),
+                "cost_per_mile":fuel_cost/mileage if mileage else 0.0,
+                "utilization":utilization/count,
+                "rentals":rentals,
+            }
+            for key,(count,mileage,fuel_cost,utilization,rentals) in groups.items()
+        }
+
+
 if __name__ == "__main__":
     car = Car("CAR001", "Toyota", "Camry", 2023, 45.0, True, 12000, "Petrol", 5, "Automatic", True)
     motorcycle = Motorcycle("BIKE001", "Harley", "Street 750", 2022, 35.0, True, 8000, "Petrol", 750, "Cruiser")
@@ -132,6 +690,82 @@ if __name__ == "__main__":
     car.add_maintenance("Oil change")
     assert len(car.get_maintenance_history()) == 1
 
+    assert not hasattr(car, "__dict__")
+    assert measure_memory_per_vehicle(1000)["bytes_per_vehicle"] < 250
+
+    # Persistent maintenance log
+    import tempfile
+    log_path = os.path.join(tempfile.mkdtemp(), "maintenance.log")
+    store = MaintenanceLogStore(log_path)
+    store.append("TRUCK001", "Brake pads", day=date(2024, 3, 1))
+    store.append("TRUCK001", "Tyres", day=date(2024, 9, 15))
+    MaintenanceRecord.maintenance_store = store
+    truck.add_maintenance("Oil change")
+    MaintenanceRecord.maintenance_store = None
+    store.close()
+    store = MaintenanceLogStore(log_path)
+    assert [e["description"] for e in store.history("TRUCK001")] == ["Brake pads", "Tyres", "Oil change"]
+    assert store.history("TRUCK001", start=date(2024, 6, 1), end=date(2024, 12, 31)) == [{"date": "2024-09-15", "description": "Tyres"}]
+    assert store.count("CAR001") == 0
+    stream = store.iter_history("TRUCK001")
+    next(stream)
+    store.append("CAR001", "Wipers")
+    assert store.count("CAR001") == 1 and len(store.history("CAR001")) == 1
+    assert len(list(stream)) == 2
+    store.close()
+
+    # Fleet analytics
+    analytics = FleetAnalytics(since=time.time() - 3600)
+    motorcycle.rent()
+    by_class = analytics.report(vehicles, by="vehicle_class")
+    assert set(by_class) == {"Car", "Motorcycle", "Truck"}
+    assert by_class["Motorcycle"]["utilization"] > 0 and by_class["Car"]["rentals"] == 1
+    assert abs(by_class["Truck"]["cost_per_mile"] - 4.1 / normalized_mpg(truck.calculate_fuel_efficiency())) < 1e-9
+    motorcycle.return_vehicle()
+    assert analytics.report(vehicles, by="fuel_type")["Petrol"]["rentals"] == 2
+
+    # Fleet registry and reservations
+    van = Car("CAR002", "Honda", "Odyssey", 2024, 70.0, True, 3000, "Hybrid", 7, "Automatic", True)
+    fleet = FleetRegistry([car, motorcycle, truck, van])
+    assert fleet.find_available(vehicle_type="Car", has_gps=True, min_seating=7) == [van]
+    assert fleet.find_available(fuel_type="Diesel", min_cargo=4000) == [truck]
+    summer = (date(2030, 7, 1), date(2030, 7, 8))
+    assert fleet.reserve("CAR002", *summer, reference="Smith family")
+    assert not fleet.reserve("CAR002", date(2030, 7, 7), date(2030, 7, 10))
+    assert fleet.find_available(min_seating=5, start=summer[0], end=summer[1]) == [car]
+    car.rent()
+    assert fleet.find_available(min_seating=5) == [van]
+    assert fleet.find_available(min_seating=5, start=summer[0], end=summer[1]) == [car]
+    car.return_vehicle()
+    car.fuel_type = "Electric"
+    van.seating_capacity = 8
+    assert fleet.find_available(fuel_type="Electric") == [car]
+    assert fleet.find_available(min_seating=8) == [van]
+    car.fuel_type = "Petrol"
+    van.seating_capacity = 7
+    assert fleet.find_available(fuel_type="Electric") == []
+    assert fleet.unregister("CAR002") is van and fleet.find_available(min_seating=5) == [car]
+    fleet.register(van)
+    for call in (lambda: FleetRegistry([van]), lambda: fleet.find_available(start=summer[0])):
+        try:
+            call()
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("expected ValueError")
+    assert van._fleet is fleet and fleet.find_available(min_seating=7) == [van]
+
+    # Batch quoting
+    pricing = PricingEngine()
+    quotes = pricing.quote(vehicles, [1, 3, 14])
+    for v, row in zip(vehicles, quotes):
+        assert list(row) == [v.calculate_rental_cost(days) for days in (1, 3, 14)]
+    pricing.add_rule(LongRentalDiscount(7, 0.1))
+    pricing.add_rule(SeasonalRate([7, 8], 1.25, vehicle_types=(Car,)))
+    quotes = pricing.quote([car, truck], [3, 14], start=date(2030, 7, 1))
+    assert abs(quotes[0][1] - car.calculate_rental_cost(14) * 0.9 * 1.25) < 0.01
+    assert abs(quotes[1][0] - truck.calculate_rental_cost(3)) < 0.01
+
 
 
 # class Vehicle: